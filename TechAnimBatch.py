@@ -0,0 +1,105 @@
+# Batch driver running the TechAnim Friend pipeline over many .blend files.
+#
+# Every file is processed by its own background Blender process, fanned out
+# over a multiprocessing pool:
+#   python TechAnimBatch.py --blender /path/to/blender --jobs 8 \
+#       --pipeline clean_up_bone_influences:max_influences=4 \
+#       --pipeline clean_up_weights_threshold:threshold=0.01 \
+#       --save --summary summary.json characters/*.blend
+#
+# This script does not need Blender's Python, it only starts Blender.
+
+import argparse
+import json
+import multiprocessing
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+ADDON_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "TechAnimFriend.py")
+
+
+def run_file(job):
+    """Run the pipeline on one .blend file in a background Blender, returns its summary entry"""
+    blender, blend_file, pipeline_args, timeout = job
+    report_fd, report_path = tempfile.mkstemp(suffix=".json", prefix="techanim_")
+    os.close(report_fd)
+
+    command = [
+        blender, "-b", "--factory-startup", blend_file,
+        "--python-exit-code", "1",
+        "--python", ADDON_PATH,
+        "--", *pipeline_args, "--report", report_path,
+    ]
+    entry = {"file": blend_file}
+    start = time.perf_counter()
+    try:
+        process = subprocess.run(command, capture_output=True, text=True, timeout=timeout)
+        entry["returncode"] = process.returncode
+        if process.returncode != 0:
+            entry["log"] = process.stdout[-2000:] + process.stderr[-2000:]
+    except subprocess.TimeoutExpired:
+        entry["returncode"] = None
+        entry["error"] = f"Timed out after {timeout} seconds"
+    entry["seconds"] = round(time.perf_counter() - start, 3)
+
+    try:
+        with open(report_path) as report_file:
+            entry["report"] = json.load(report_file)
+    except (OSError, ValueError):
+        entry["report"] = None
+    finally:
+        os.remove(report_path)
+
+    entry["ok"] = entry["returncode"] == 0 and bool(entry["report"]) and entry["report"]["ok"]
+    return entry
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run a TechAnim Friend pipeline over many .blend files in parallel")
+    parser.add_argument("files", nargs="+", help=".blend files to process")
+    parser.add_argument("--blender", default=os.environ.get("BLENDER", "blender"), help="Blender executable")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count(), help="Number of Blender processes at once")
+    parser.add_argument("--timeout", type=float, default=None, help="Timeout per file in seconds")
+    parser.add_argument("--pipeline", action="append", default=[], metavar="OP[:KEY=VALUE,...]", help="Pipeline step, repeat for several steps")
+    parser.add_argument("--config", help="JSON pipeline config passed to every Blender process")
+    parser.add_argument("--save", action="store_true", help="Save every file in place after the pipeline")
+    parser.add_argument("--summary", help="Write the JSON summary to this path instead of stdout")
+    args = parser.parse_args(argv)
+
+    pipeline_args = []
+    for step in args.pipeline:
+        pipeline_args += ["--pipeline", step]
+    if args.config:
+        pipeline_args += ["--config", os.path.abspath(args.config)]
+    if args.save:
+        pipeline_args.append("--save")
+
+    jobs = [(args.blender, os.path.abspath(path), pipeline_args, args.timeout) for path in args.files]
+    start = time.perf_counter()
+    results = []
+    with multiprocessing.Pool(max(1, min(args.jobs, len(jobs)))) as pool:
+        for entry in pool.imap_unordered(run_file, jobs):
+            status = "ok" if entry["ok"] else "FAILED"
+            print(f"{status:>6} {entry['seconds']:>8.2f}s  {entry['file']}", file=sys.stderr)
+            results.append(entry)
+
+    results.sort(key=lambda entry: entry["file"])
+    summary = {
+        "files": results,
+        "num_files": len(results),
+        "num_failed": sum(not entry["ok"] for entry in results),
+        "seconds": round(time.perf_counter() - start, 3),
+    }
+    if args.summary:
+        with open(args.summary, "w") as summary_file:
+            json.dump(summary, summary_file, indent=2)
+    else:
+        print(json.dumps(summary, indent=2))
+    return 1 if summary["num_failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
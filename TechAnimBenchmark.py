@@ -0,0 +1,386 @@
+# Benchmark suite for the TechAnim Friend operators.
+#
+# Run it with Blender in background mode:
+#   blender -b --factory-startup --python TechAnimBenchmark.py -- \
+#       --sizes 1000 10000 100000 --groups 8 120 --bones 50 1000 --json bench.json --csv bench.csv
+#
+# Every operator runs on procedurally generated skinned grids or armatures.
+# A result records the execute wall time, the peak Python memory
+# (tracemalloc, NumPy buffers included) and the item counts of the addon's
+# own profiler, such as the VertexGroup.add/remove calls. RNA functions do
+# not show up in sys.setprofile, so they are counted where the addon makes
+# them.
+
+import argparse
+import csv
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import bpy
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import TechAnimFriend  # noqa: E402
+
+
+def make_skinned_grid(name, num_vertices, num_groups, max_influences, seed=0):
+    """Create a square grid mesh object with random weights in num_groups vertex groups"""
+    rng = np.random.default_rng(seed)
+    side = max(int(np.ceil(np.sqrt(num_vertices))), 2)
+
+    xs, ys = np.meshgrid(np.arange(side, dtype=np.float32), np.arange(side, dtype=np.float32))
+    co = np.column_stack([xs.ravel() - (side - 1) / 2, ys.ravel(), np.zeros(side * side, dtype=np.float32)])
+
+    corner = (np.arange(side - 1)[None, :] + np.arange(side - 1)[:, None] * side).ravel()
+    quads = np.column_stack([corner, corner + 1, corner + side + 1, corner + side])
+
+    mesh = bpy.data.meshes.new(name)
+    mesh.vertices.add(len(co))
+    mesh.vertices.foreach_set('co', co.ravel())
+    mesh.loops.add(quads.size)
+    mesh.loops.foreach_set('vertex_index', quads.ravel().astype(np.int32))
+    mesh.polygons.add(len(quads))
+    mesh.polygons.foreach_set('loop_start', (np.arange(len(quads)) * 4).astype(np.int32))
+    mesh.update(calc_edges=True)
+    mesh.validate()
+
+    obj = bpy.data.objects.new(name, mesh)
+    bpy.context.scene.collection.objects.link(obj)
+
+    # Random influences quantized to 64 levels so setup needs few add() calls,
+    # groups come in .L/.R pairs for the symmetrize benchmark
+    vgroups = [obj.vertex_groups.new(name=f"Bone_{i // 2:03d}.{'LR'[i % 2]}") for i in range(num_groups)]
+    num_verts = len(co)
+    for _ in range(max_influences):
+        group_of_vert = rng.integers(0, num_groups, num_verts)
+        level_of_vert = rng.integers(1, 65, num_verts)
+        order = np.lexsort((level_of_vert, group_of_vert))
+        keys = group_of_vert[order] * 100 + level_of_vert[order]
+        starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+        for start, end in zip(starts, np.r_[starts[1:], num_verts]):
+            vert_indices = order[start:end].tolist()
+            vgroups[group_of_vert[order[start]]].add(vert_indices, level_of_vert[order[start]] / 64.0, 'ADD')
+    return obj
+
+
+def make_armature(name, num_bones, seed=0):
+    """Create an armature object with num_bones bones in branching chains and a random pose"""
+    rng = np.random.default_rng(seed)
+    armature = bpy.data.armatures.new(name)
+    obj = bpy.data.objects.new(name, armature)
+    bpy.context.scene.collection.objects.link(obj)
+
+    activate(obj)
+    bpy.ops.object.mode_set(mode='EDIT')
+    bones = []
+    for i in range(num_bones):
+        bone = armature.edit_bones.new(f"bone_{i:04d}")
+        parent = bones[int(rng.integers(0, len(bones)))] if bones else None
+        head = parent.tail.copy() if parent else (0.0, 0.0, 0.0)
+        bone.head = head
+        bone.tail = (head[0] + rng.normal(0, 0.1), head[1] + rng.normal(0, 0.1), head[2] + 0.2)
+        bone.parent = parent
+        bone.use_connect = parent is not None
+        bones.append(bone)
+    bpy.ops.object.mode_set(mode='OBJECT')
+
+    for pose_bone in obj.pose.bones:
+        pose_bone.rotation_mode = 'QUATERNION'
+        quaternion = rng.normal(size=4)
+        pose_bone.rotation_quaternion = quaternion / np.linalg.norm(quaternion)
+    return obj
+
+
+def make_rig(name, obj, num_selected, seed=0):
+    """Create an armature with a deform bone for every vertex group of obj and an Armature modifier on obj
+
+    The bones float over the side of the grid their .L/.R group belongs to,
+    the first num_selected bones are selected.
+    """
+    coords = np.empty(len(obj.data.vertices) * 3, dtype=np.float32)
+    obj.data.vertices.foreach_get('co', coords)
+    coords = coords.reshape(-1, 3)
+    half_width = np.abs(coords[:, 0]).max()
+    length = coords[:, 1].max()
+
+    armature = bpy.data.armatures.new(name)
+    rig = bpy.data.objects.new(name, armature)
+    bpy.context.scene.collection.objects.link(rig)
+    activate(rig)
+    bpy.ops.object.mode_set(mode='EDIT')
+    names = [vgroup.name for vgroup in obj.vertex_groups]
+    num_pairs = max((len(names) + 1) // 2, 1)
+    for i, bone_name in enumerate(names):
+        bone = armature.edit_bones.new(bone_name)
+        side = 1.0 if bone_name.endswith(".L") else -1.0
+        y = length * (i // 2) / num_pairs
+        bone.head = (side * half_width / 2, y, 1.0)
+        bone.tail = (side * half_width / 2, y + 0.8 * length / num_pairs, 1.0)
+    bpy.ops.object.mode_set(mode='OBJECT')
+
+    for i, bone in enumerate(armature.bones):
+        bone.select = i < num_selected
+    obj.modifiers.new("Armature", 'ARMATURE').object = rig
+    return rig
+
+
+def activate(obj, *others):
+    """Select obj and others, obj being the active object and selected last"""
+    if bpy.context.object and bpy.context.object.mode != 'OBJECT':
+        bpy.ops.object.mode_set(mode='OBJECT')
+    for other in bpy.context.view_layer.objects:
+        other.select_set(False)
+    for other in others + (obj,):
+        other.select_set(True)
+    bpy.context.view_layer.objects.active = obj
+
+
+def select_vertices(obj, fraction, seed=0):
+    """Select a random fraction of the mesh vertices"""
+    rng = np.random.default_rng(seed)
+    selection = rng.random(len(obj.data.vertices)) < fraction
+    obj.data.vertices.foreach_set('select', selection)
+
+
+def measure(operator, **kwargs):
+    """Run an operator in the current context, returns its timing, peak memory and profiler counts"""
+    history = TechAnimFriend._profile_history
+    last = history[-1] if history else None
+    bpy.context.scene.techanim_profiling = True
+    tracemalloc.start()
+    error = None
+    start = time.perf_counter()
+    try:
+        result = sorted(operator(**kwargs))
+    except RuntimeError as exc:
+        result = []
+        error = str(exc).strip()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    bpy.context.scene.techanim_profiling = False
+
+    # The record of this run, if the operator is instrumented
+    counts = dict(history[-1].counts) if history and history[-1] is not last else {}
+    return {
+        "seconds": round(elapsed, 5),
+        "peak_mb": round(peak / 2 ** 20, 3),
+        "vertex_group_calls": counts.get("vertex group calls", 0),
+        "counts": counts,
+        "result": "/".join(result),
+        "error": error,
+    }
+
+
+def check_call_counting(num_groups=6):
+    """Fail early unless a run with a known number of VertexGroup.add calls is counted exactly
+
+    Every vertex of the grid holds one weight of 0.5 in one group, so
+    normalizing sets every group to 1.0 with a single add() call per group.
+    """
+    obj = make_skinned_grid("bench_calls", 100, num_groups, 0)
+    vertex_indices = np.arange(len(obj.data.vertices))
+    for i, vgroup in enumerate(obj.vertex_groups):
+        vgroup.add(vertex_indices[vertex_indices % num_groups == i].tolist(), 0.5, 'REPLACE')
+    activate(obj)
+    row = measure(bpy.ops.object.clean_up_bone_influences, max_influences=4)
+    remove_object(obj)
+    if row["vertex_group_calls"] != num_groups:
+        raise RuntimeError(f"Counted {row['vertex_group_calls']} vertex group calls, expected {num_groups}")
+
+
+def step_frames(frames):
+    """Step the scene through frames 1..frames, running the frame change handlers"""
+    scene = bpy.context.scene
+    for frame in range(1, frames + 1):
+        scene.frame_set(frame)
+    return {'FINISHED'}
+
+
+def remove_object(obj):
+    data = obj.data
+    bpy.data.objects.remove(obj)
+    if isinstance(data, bpy.types.Mesh):
+        bpy.data.meshes.remove(data)
+    elif isinstance(data, bpy.types.Armature):
+        bpy.data.armatures.remove(data)
+
+
+# (operator, mode the mesh is in, operator arguments)
+MESH_CASES = [
+    ("clean_up_bone_influences", 'OBJECT', {"max_influences": 4}),
+    ("clean_up_weights_threshold", 'OBJECT', {"threshold": 0.05}),
+    ("analyze_weights", 'OBJECT', {"max_influences": 4, "check_symmetry": True}),
+    ("quantize_weights", 'OBJECT', {"max_influences": 4}),
+    ("compact_vertex_groups", 'OBJECT', {"threshold": 0.05}),
+    ("smooth_selected_vertices_weights", 'EDIT', {"iterations": 10}),
+    ("symmetrize_and_smooth_weights", 'EDIT', {"axis": 'X'}),
+]
+
+# (operator, operator arguments, snapshot file), run in this order on one grid, so
+# the imports read back the snapshots the exports wrote
+SNAPSHOT_CASES = [
+    ("export_weights", {"memory_mappable": False}, "snapshot.npz"),
+    ("export_weights", {"memory_mappable": True}, "snapshot.npz"),
+    ("import_weights", {"match": 'INDEX'}, "snapshot.npz"),
+    ("import_weights", {"match": 'INDEX'}, "snapshot.weights"),
+    ("import_weights", {"match": 'POSITION'}, "snapshot.npz"),
+]
+
+# (operator, operator arguments), run with the skinned grid active and an unweighted
+# grid of the same size selected, offset so its vertices fall inside the source faces
+TRANSFER_CASES = [
+    ("transfer_weights", {"method": 'SURFACE', "max_influences": 4}),
+    ("transfer_weights", {"method": 'VERTEX', "max_influences": 4}),
+]
+
+# (operator, operator arguments), run on a grid deformed by a rig with a bone per
+# vertex group, RIG_SELECTED_BONES of them selected. The armature is in Pose Mode
+# and the grid in Edit Mode with selected vertices for operators that need it.
+RIG_SELECTED_BONES = 8
+RIG_CASES = [
+    ("distribute_weights_by_distance", {"mode": 'SELECTED', "max_influences": 4}),
+    ("heat_diffuse_weights", {"max_influences": 4}),
+]
+RIG_POSE_MODE_CASES = {"distribute_weights_by_distance"}
+
+# (operator, operator arguments), run with the recipient selected and the donor active
+ARMATURE_CASES = [
+    ("copy_bones_transforms_pose_mode", {}),
+    ("copy_bones_transforms_edit_mode", {}),
+    ("create_constraints", {}),
+    ("remove_constraints", {}),
+    ("bake_retarget", {"use_scene_range": False, "frame_start": 1, "frame_end": 25}),
+]
+
+# Frames stepped with the live retarget handler running, once per link space
+LIVE_RETARGET_FRAMES = 25
+
+
+def record(results, name, case, row):
+    row.update(case, operator=name)
+    results.append(row)
+    print(f"{name:<34} {json.dumps(case):<36} {row['seconds']:>9.3f}s {row['peak_mb']:>9.1f} MB {row['vertex_group_calls']:>9} calls"
+          + (f"  ERROR: {row['error']}" if row["error"] else ""))
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description="Benchmark TechAnim Friend operators on synthetic meshes and rigs")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000, 500000], help="Mesh vertex counts")
+    parser.add_argument("--groups", type=int, nargs="+", default=[8, 50, 200], help="Vertex group counts")
+    parser.add_argument("--influences", type=int, default=8, help="Random influences per vertex before cleanup")
+    parser.add_argument("--selection", type=float, default=0.25, help="Selected vertex fraction for edit mode operators")
+    parser.add_argument("--bones", type=int, nargs="+", default=[50, 200, 1000], help="Armature bone counts")
+    parser.add_argument("--json", help="Write the results to this JSON file")
+    parser.add_argument("--csv", help="Write the results to this CSV file")
+    args = parser.parse_args(argv)
+
+    TechAnimFriend.register()
+    check_call_counting()
+    results = []
+
+    for size in args.sizes:
+        for num_groups in args.groups:
+            for name, mode, kwargs in MESH_CASES:
+                # Fresh weights for every operator so earlier cleanups do not skew later ones
+                obj = make_skinned_grid(f"bench_{size}_{num_groups}", size, num_groups, args.influences)
+                activate(obj)
+                if mode == 'EDIT':
+                    select_vertices(obj, args.selection)
+                    bpy.ops.object.mode_set(mode='EDIT')
+
+                case = {"vertices": len(obj.data.vertices), "groups": num_groups}
+                record(results, name, case, measure(getattr(bpy.ops.object, name), **kwargs))
+
+                activate(obj)
+                remove_object(obj)
+
+            with tempfile.TemporaryDirectory(prefix="techanim_bench_") as folder:
+                obj = make_skinned_grid(f"bench_{size}_{num_groups}", size, num_groups, args.influences)
+                activate(obj)
+                for name, kwargs, file_name in SNAPSHOT_CASES:
+                    case = {"vertices": len(obj.data.vertices), "groups": num_groups, "file": file_name, **kwargs}
+                    filepath = os.path.join(folder, file_name)
+                    record(results, name, case, measure(getattr(bpy.ops.object, name), filepath=filepath, **kwargs))
+                remove_object(obj)
+
+            for name, kwargs in TRANSFER_CASES:
+                source = make_skinned_grid(f"bench_{size}_{num_groups}", size, num_groups, args.influences)
+                target = make_skinned_grid(f"bench_target_{size}", size, 0, 0)
+                target.location = (0.25, 0.25, 0.1)
+                bpy.context.view_layer.update()
+                activate(source, target)
+
+                case = {"vertices": len(source.data.vertices), "groups": num_groups, "method": kwargs["method"]}
+                record(results, name, case, measure(getattr(bpy.ops.object, name), **kwargs))
+
+                activate(source)
+                remove_object(source)
+                remove_object(target)
+
+            for name, kwargs in RIG_CASES:
+                obj = make_skinned_grid(f"bench_{size}_{num_groups}", size, num_groups, args.influences)
+                rig = make_rig(f"bench_rig_{num_groups}", obj, RIG_SELECTED_BONES)
+                if name in RIG_POSE_MODE_CASES:
+                    # Pose Mode stays on the armature while the grid becomes the active object
+                    activate(rig)
+                    bpy.ops.object.mode_set(mode='POSE')
+                    rig.select_set(False)
+                    obj.select_set(True)
+                    bpy.context.view_layer.objects.active = obj
+                    select_vertices(obj, args.selection)
+                    bpy.ops.object.mode_set(mode='EDIT')
+                else:
+                    activate(obj)
+
+                # Solve the heat from scratch every time
+                TechAnimFriend._heat_cache.clear()
+                TechAnimFriend._heat_starts.clear()
+                case = {"vertices": len(obj.data.vertices), "groups": num_groups}
+                record(results, name, case, measure(getattr(bpy.ops.object, name), **kwargs))
+
+                activate(obj)
+                remove_object(obj)
+                remove_object(rig)
+
+    for num_bones in args.bones:
+        donor = make_armature(f"donor_{num_bones}", num_bones, seed=1)
+        recipient = make_armature(f"recipient_{num_bones}", num_bones, seed=2)
+        for name, kwargs in ARMATURE_CASES:
+            activate(donor, recipient)
+            record(results, name, {"bones": num_bones}, measure(getattr(bpy.ops.object, name), **kwargs))
+
+        # Live retarget: link the recipient, then step frames with the frame change handler copying the pose
+        scene = bpy.context.scene
+        for space in ('LOCAL', 'WORLD'):
+            activate(donor, recipient)
+            record(results, "link_live_retarget", {"bones": num_bones, "space": space},
+                   measure(bpy.ops.object.link_live_retarget, space=space))
+            scene.techanim_live_retarget = True
+            record(results, "live_retarget_frames", {"bones": num_bones, "space": space, "frames": LIVE_RETARGET_FRAMES},
+                   measure(step_frames, frames=LIVE_RETARGET_FRAMES))
+            scene.techanim_live_retarget = False
+            bpy.ops.object.unlink_live_retarget()
+
+        activate(donor)
+        remove_object(donor)
+        remove_object(recipient)
+
+    meta = {"blender": bpy.app.version_string, "addon_version": list(TechAnimFriend.bl_info["version"])}
+    if args.json:
+        with open(args.json, "w") as json_file:
+            json.dump({"meta": meta, "results": results}, json_file, indent=2)
+    if args.csv:
+        fields = ["operator", "vertices", "groups", "method", "file", "match", "memory_mappable", "bones", "space", "frames", "seconds", "peak_mb", "vertex_group_calls", "result", "error"]
+        with open(args.csv, "w", newline="") as csv_file:
+            writer = csv.DictWriter(csv_file, fieldnames=fields, extrasaction='ignore')
+            writer.writeheader()
+            writer.writerows(results)
+
+
+if __name__ == "__main__":
+    main(sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else [])
@@ -8,16 +8,1543 @@ bl_info = {
     "category": "Rigging",
 }
 
+import argparse
+import cProfile
+import functools
+import hashlib
+import inspect
+import json
+import os
+import pstats
+import re
+import sys
+import threading
+import time
+from array import array
+from collections import OrderedDict, deque
+from concurrent import futures
+from contextlib import contextmanager
+
 import bpy
 import bmesh
-from bpy.props import IntProperty, FloatProperty
+import mathutils
+import numpy as np
+from bpy.props import IntProperty, FloatProperty, BoolProperty, StringProperty
+from bpy_extras.io_utils import ExportHelper, ImportHelper
+
+try:
+    from scipy import sparse
+    from scipy.sparse import linalg as sparse_linalg
+except ImportError:  # SciPy is not bundled with Blender, fall back to NumPy
+    sparse = None
+
+
+# Opt-in operator instrumentation, enabled with Scene.techanim_profiling.
+# Helpers and operators mark their hot phases with profile_phase() and item
+# counts with profile_count(); both are no-ops unless an instrumented operator
+# is running. Phase times are exclusive, a nested phase pauses its parent.
+# Modal operators record every step of a run into one record, the time
+# between their steps is not counted.
+PROFILE_HISTORY_SIZE = 20
+_profile_history = deque(maxlen=PROFILE_HISTORY_SIZE)
+_profile_run = None
+_last_cprofile = None
+
+
+class ProfileRecord:
+    """Phase timings and item counts of one operator run"""
+
+    def __init__(self, operator):
+        self.operator = operator
+        self.phases = OrderedDict()
+        self.counts = OrderedDict()
+        self.total = 0.0
+        self.result = None
+        self.profiler = None
+        self._stack = []
+
+    def enter(self, name):
+        now = time.perf_counter()
+        if self._stack:
+            self._pause(now)
+        self._stack.append([name, now])
+
+    def exit(self):
+        now = time.perf_counter()
+        self._pause(now)
+        self._stack.pop()
+        if self._stack:
+            self._stack[-1][1] = now
+
+    def _pause(self, now):
+        name, start = self._stack[-1]
+        self.phases[name] = self.phases.get(name, 0.0) + now - start
+
+    def suspend(self):
+        """Stop the clock of the open phase between two steps of a modal run"""
+        if self._stack:
+            self._pause(time.perf_counter())
+
+    def resume(self):
+        if self._stack:
+            self._stack[-1][1] = time.perf_counter()
+
+    @property
+    def other(self):
+        """Time spent outside of any marked phase"""
+        return max(self.total - sum(self.phases.values()), 0.0)
+
+    def summary(self):
+        phases = ", ".join(f"{name} {seconds * 1000:.1f} ms" for name, seconds in self.phases.items())
+        counts = ", ".join(f"{name} {count}" for name, count in self.counts.items())
+        return f"{self.operator}: {self.total * 1000:.1f} ms ({phases}, other {self.other * 1000:.1f} ms) [{counts}]"
+
+
+@contextmanager
+def profile_phase(name):
+    """Time a block as the named phase of the running operator, worker threads are not timed"""
+    record = _profile_run
+    if record is None or threading.current_thread() is not threading.main_thread():
+        yield
+        return
+    record.enter(name)
+    try:
+        yield
+    finally:
+        record.exit()
+
+
+def profile_count(name, count):
+    """Add count items to the named counter of the running operator"""
+    if _profile_run is not None and threading.current_thread() is threading.main_thread():
+        _profile_run.counts[name] = _profile_run.counts.get(name, 0) + int(count)
+
+
+def start_profile(operator, scene):
+    """Open a record for an operator run when Scene.techanim_profiling is on, None otherwise"""
+    # Operators called from an instrumented operator are part of its record
+    if _profile_run is not None or not getattr(scene, "techanim_profiling", False):
+        return None
+    record = ProfileRecord(operator)
+    if scene.techanim_profiling_cprofile:
+        record.profiler = cProfile.Profile()
+    return record
+
+
+@contextmanager
+def profile_step(record):
+    """Record a block as part of an opened run, a modal operator records each of its steps"""
+    global _profile_run
+    if record is None:
+        yield
+        return
+    _profile_run = record
+    record.resume()
+    start = time.perf_counter()
+    if record.profiler:
+        record.profiler.enable()
+    try:
+        yield
+    finally:
+        if record.profiler:
+            record.profiler.disable()
+        record.total += time.perf_counter() - start
+        record.suspend()
+        _profile_run = None
+
+
+def end_profile(record, result):
+    """Close an opened run and add it to the history"""
+    global _last_cprofile
+    if record is None:
+        return
+    record.result = result
+    if record.profiler:
+        _last_cprofile = (record.operator, record.profiler)
+    _profile_history.append(record)
+    print(f"TechAnim Friend profile: {record.summary()}")
+
+
+def instrumented(execute):
+    """Record phase timings of an operator's execute when Scene.techanim_profiling is on"""
+    @functools.wraps(execute)
+    def wrapper(self, context):
+        record = start_profile(self.bl_idname, context.scene)
+        result = None
+        try:
+            with profile_step(record):
+                result = execute(self, context)
+            return result
+        finally:
+            end_profile(record, result)
+    return wrapper
+
+
+def set_mode(mode):
+    """Switch the active object's mode, timed as the mode switch phase"""
+    with profile_phase("mode switch"):
+        bpy.ops.object.mode_set(mode=mode)
+
+
+# Chunked jobs: long operations are generators that yield after every chunk
+# of work, so a modal operator can spread them over timer events. Running a
+# generator to the end gives the synchronous result.
+WEIGHT_CHUNK_SIZE = 4096
+
+
+def run_to_end(steps):
+    """Run a chunked generator to the end, returns its result"""
+    while True:
+        try:
+            next(steps)
+        except StopIteration as stop:
+            return stop.value
+
+
+def job_stage(label, steps, start=0.0, end=1.0):
+    """Run a chunked generator yielding fractions as one stage of a job
+
+    Yields (label, progress) with the stage mapped to start..end of the job
+    and returns the generator's result.
+    """
+    while True:
+        try:
+            fraction = next(steps)
+        except StopIteration as stop:
+            return stop.value
+        yield label, start + (end - start) * (fraction or 0.0)
+
+
+# Bulk vertex weight helpers shared by the weight operators.
+# Weights are kept as flat entry arrays in CSR layout: indptr[v]:indptr[v + 1]
+# spans the (group, weight) entries of vertex v.
+def iter_read_vertex_weights(obj, vertices=None, chunk_size=WEIGHT_CHUNK_SIZE):
+    """Read every vertex group weight of a mesh object in one pass, returns (indptr, groups, weights)
+
+    With vertices given only those vertices are read, CSR row i holding
+    vertex vertices[i]. Yields the fraction of vertices read after every chunk.
+    """
+    with profile_phase("read weights"):
+        # Typed arrays keep 4 bytes per entry while reading instead of a Python object each
+        counts = array('i')
+        groups = array('i')
+        weights = array('f')
+        mesh_vertices = obj.data.vertices
+        if vertices is not None:
+            mesh_vertices = [mesh_vertices[i] for i in vertices.tolist()]
+        num_vertices = len(mesh_vertices)
+        for i, vert in enumerate(mesh_vertices, 1):
+            vert_groups = vert.groups
+            counts.append(len(vert_groups))
+            for g in vert_groups:
+                groups.append(g.group)
+                weights.append(g.weight)
+            if i % chunk_size == 0:
+                yield i / num_vertices
+
+        indptr = np.zeros(len(counts) + 1, dtype=np.int64)
+        np.cumsum(np.frombuffer(counts, dtype=np.int32), out=indptr[1:])
+    profile_count("vertices read", len(counts))
+    profile_count("weights read", len(weights))
+    return indptr, np.frombuffer(groups, dtype=np.int32).copy(), np.frombuffer(weights, dtype=np.float32).copy()
+
+
+def entry_rows(indptr):
+    """Vertex index of every entry of a CSR weight layout"""
+    return np.repeat(np.arange(len(indptr) - 1), np.diff(indptr))
+
+
+def csr_row_sums(indptr, values):
+    """Sum the entries of every CSR row, empty rows sum to 0"""
+    sums = np.zeros(len(indptr) - 1, dtype=np.float64)
+    nonempty = np.diff(indptr) > 0
+    if nonempty.any():
+        sums[nonempty] = np.add.reduceat(values.astype(np.float64), indptr[:-1][nonempty])
+    return sums
+
+
+def limit_entry_influences(indptr, weights, max_influences):
+    """Return a mask of the entries kept when every vertex keeps only its max_influences largest weights"""
+    counts = np.diff(indptr)
+    keep = np.ones(len(weights), dtype=bool)
+    over_rows = np.flatnonzero(counts > max_influences)
+    if not len(over_rows):
+        return keep
+
+    # Pack the over-limit vertices into a padded (vertices x influences) matrix
+    row_counts = counts[over_rows]
+    local_rows = np.repeat(np.arange(len(over_rows)), row_counts)
+    entries = np.flatnonzero(np.repeat(counts > max_influences, counts))
+    slots = entries - indptr[over_rows][local_rows]
+    padded = np.full((len(over_rows), row_counts.max()), -np.inf, dtype=np.float32)
+    padded[local_rows, slots] = weights[entries]
+
+    # Top-K per row without a full sort, padding never makes it into the top K
+    top_slots = np.argpartition(-padded, max_influences - 1, axis=1)[:, :max_influences]
+    keep[entries] = False
+    keep[(indptr[over_rows][:, None] + top_slots).ravel()] = True
+    return keep
+
+
+def quantize_entries(indptr, weights, levels):
+    """Quantize the weights of every CSR row to integers summing exactly to levels
+
+    Every row is scaled to sum to levels and rounded down, the missing units go
+    to the entries with the largest remainders, ties to the earlier entry.
+    Rows without weight stay 0.
+    """
+    rows = entry_rows(indptr)
+    row_totals = csr_row_sums(indptr, weights)
+    totals = row_totals[rows]
+    scaled = np.divide(weights.astype(np.float64) * levels, totals, out=np.zeros(len(weights)), where=totals > 0.0)
+    quantized = np.floor(scaled).astype(np.int64)
+
+    # Rank the remainders within every row on rows padded to the same width
+    slots = np.arange(len(weights)) - indptr[rows]
+    remainders = np.full((len(indptr) - 1, int(np.diff(indptr).max(initial=1))), -1.0)
+    remainders[rows, slots] = scaled - quantized
+    ranks = np.empty(remainders.shape, dtype=np.int64)
+    np.put_along_axis(ranks, np.argsort(-remainders, axis=1, kind='stable'), np.arange(remainders.shape[1]), axis=1)
+
+    deficits = np.where(row_totals > 0.0, levels - np.rint(csr_row_sums(indptr, quantized)).astype(np.int64), 0)
+    return quantized + (ranks[rows, slots] < deficits[rows])
+
+
+def pack_influences(indptr, groups, weights, levels, max_influences):
+    """Fixed width (vertices x max_influences) group index and quantized weight arrays, strongest first, zero padded
+
+    Every row may have at most max_influences entries. Indices are 8 or 16 bit
+    depending on the group count, weights 8 or 16 bit depending on levels.
+    """
+    rows = entry_rows(indptr)
+    slots = np.arange(len(weights)) - indptr[rows]
+    padded_weights = np.full((len(indptr) - 1, max_influences), -1.0)
+    padded_weights[rows, slots] = weights
+    padded_groups = np.zeros(padded_weights.shape, dtype=np.int64)
+    padded_groups[rows, slots] = groups
+
+    order = np.argsort(-padded_weights, axis=1, kind='stable')
+    padded_weights = np.take_along_axis(padded_weights, order, axis=1)
+    padded_groups = np.take_along_axis(padded_groups, order, axis=1)
+    padding = padded_weights < 0.0
+
+    index_dtype = '<u1' if int(groups.max(initial=0)) < 256 else '<u2'
+    weight_dtype = '<u1' if levels < 256 else '<u2'
+    indices = np.where(padding, 0, padded_groups).astype(index_dtype)
+    packed = np.rint(np.where(padding, 0.0, padded_weights) * levels).astype(weight_dtype)
+    return indices, packed
+
+
+def csr_take(indptr, rows):
+    """Select CSR rows, returns the new indptr and the positions of the selected entries"""
+    starts = indptr[rows]
+    counts = indptr[rows + 1] - starts
+    new_indptr = np.zeros(len(rows) + 1, dtype=np.int64)
+    np.cumsum(counts, out=new_indptr[1:])
+    return new_indptr, np.repeat(starts - new_indptr[:-1], counts) + np.arange(new_indptr[-1])
+
+
+def blend_csr_rows(indptr, groups, weights, sources, factors):
+    """Blend CSR weight rows, row i of the result is the sum of factors[i, k] * row sources[i, k]
+
+    sources and factors are (rows x k) arrays. Returns (indptr, groups, weights)
+    with the groups of every row in ascending order.
+    """
+    num_rows, k = sources.shape
+    taken_indptr, positions = csr_take(indptr, sources.ravel())
+    rows = entry_rows(taken_indptr) // k
+    entry_groups = groups[positions].astype(np.int64)
+    entry_weights = weights[positions] * np.repeat(factors.ravel(), np.diff(taken_indptr))
+
+    # Sum the entries of every (row, group) pair
+    stride = int(entry_groups.max(initial=0)) + 1
+    keys, inverse = np.unique(rows * stride + entry_groups, return_inverse=True)
+    summed = np.bincount(inverse, weights=entry_weights, minlength=len(keys))
+    nonzero = summed > 0.0
+    keys, summed = keys[nonzero], summed[nonzero]
+
+    new_indptr = np.zeros(num_rows + 1, dtype=np.int64)
+    np.cumsum(np.bincount(keys // stride, minlength=num_rows), out=new_indptr[1:])
+    return new_indptr, (keys % stride).astype(np.int32), summed.astype(np.float32)
+
+
+def _split_sorted(*keys):
+    """Yield (start, end) spans of equal consecutive values across the sorted key arrays"""
+    size = len(keys[0])
+    if not size:
+        return
+    boundary = np.zeros(size, dtype=bool)
+    boundary[0] = True
+    for key in keys:
+        boundary[1:] |= key[1:] != key[:-1]
+    starts = np.flatnonzero(boundary)
+    ends = np.append(starts[1:], size)
+    yield from zip(starts.tolist(), ends.tolist())
+
+
+def write_vertex_weights(obj, old_rows, old_groups, old_weights, new_rows, new_groups, new_weights):
+    """Apply the difference between two weight snapshots to the object's vertex groups
+
+    Entries that disappeared cost one remove() call per group, new or changed
+    entries cost one add() call per distinct weight value in a group.
+    Returns (num_removed, num_written).
+    """
+    return run_to_end(iter_write_vertex_weights(
+        obj, old_rows, old_groups, old_weights, new_rows, new_groups, new_weights))
+
+
+def iter_write_vertex_weights(obj, old_rows, old_groups, old_weights, new_rows, new_groups, new_weights):
+    """Chunked write_vertex_weights, yields the fraction of vertex group calls done after every call"""
+    vgroups = obj.vertex_groups
+    stride = np.int64(max(len(vgroups), 1))
+    old_keys = old_rows.astype(np.int64) * stride + old_groups
+    new_keys = new_rows.astype(np.int64) * stride + new_groups
+
+    order = np.argsort(old_keys, kind='stable')
+    sorted_keys = old_keys[order]
+    sorted_weights = np.asarray(old_weights, dtype=np.float32)[order]
+    new_weights = np.asarray(new_weights, dtype=np.float32)
+
+    if len(sorted_keys):
+        pos = np.minimum(np.searchsorted(sorted_keys, new_keys), len(sorted_keys) - 1)
+        found = sorted_keys[pos] == new_keys
+        changed = ~found | (sorted_weights[pos] != new_weights)
+    else:
+        changed = np.ones(len(new_keys), dtype=bool)
+    removed = ~np.isin(old_keys, new_keys)
+
+    # One remove() per group for every entry that disappeared
+    rem_rows = old_rows[removed]
+    rem_groups = old_groups[removed]
+    order = np.argsort(rem_groups, kind='stable')
+    rem_rows, rem_groups = rem_rows[order], rem_groups[order]
+    removals = list(_split_sorted(rem_groups))
+
+    # One add() per (group, weight) bucket for every new or changed entry
+    add_rows = new_rows[changed]
+    add_groups = new_groups[changed]
+    add_weights = new_weights[changed]
+    order = np.lexsort((add_weights, add_groups))
+    add_rows, add_groups, add_weights = add_rows[order], add_groups[order], add_weights[order]
+    additions = list(_split_sorted(add_groups, add_weights))
+    num_calls = max(len(removals) + len(additions), 1)
+
+    with profile_phase("write weights"):
+        for call, (start, end) in enumerate(removals, 1):
+            vgroups[int(rem_groups[start])].remove(rem_rows[start:end].tolist())
+            profile_count("vertex group calls", 1)
+            yield call / num_calls
+        for call, (start, end) in enumerate(additions, len(removals) + 1):
+            vgroups[int(add_groups[start])].add(add_rows[start:end].tolist(), float(add_weights[start]), 'REPLACE')
+            profile_count("vertex group calls", 1)
+            yield call / num_calls
+
+    profile_count("weights removed", removed.sum())
+    profile_count("weights written", changed.sum())
+    return int(removed.sum()), int(changed.sum())
+
+
+def read_edge_array(mesh):
+    """Vertex pairs of all mesh edges as an (edges x 2) array"""
+    edges = np.empty(len(mesh.edges) * 2, dtype=np.int32)
+    mesh.edges.foreach_get('vertices', edges)
+    return edges.reshape(-1, 2)
+
+
+@profile_phase("adjacency")
+def build_selection_adjacency(vertex_adjacency, selected):
+    """Build the neighbor matrix of the selected vertices over the selection and its one-ring
+
+    vertex_adjacency is the (indptr, indices) tuple of get_vertex_adjacency and
+    selected a sorted index array, the cost only depends on the selection size.
+    Returns (region, indptr, indices): region holds the mesh indices of the
+    selection followed by its unselected neighbors, and the CSR rows list the
+    region-local neighbors of every selected vertex.
+    """
+    all_indptr, all_indices = vertex_adjacency
+    indptr, positions = csr_take(all_indptr, selected)
+    neighbors = all_indices[positions]
+
+    ring = np.setdiff1d(neighbors, selected)
+    region = np.concatenate([selected, ring])
+    sorter = np.argsort(region)
+    return region, indptr, sorter[np.searchsorted(region, neighbors, sorter=sorter)]
+
+
+def read_vertex_coords(mesh):
+    """Coordinates of all mesh vertices as a (vertices x 3) array"""
+    coords = np.empty(len(mesh.vertices) * 3, dtype=np.float32)
+    mesh.vertices.foreach_get('co', coords)
+    return coords.reshape(-1, 3)
+
+
+def mesh_topology_digest(mesh, edges=None):
+    """Digest of the vertex count and edge array of a mesh"""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(np.int64(len(mesh.vertices)).tobytes())
+    digest.update((read_edge_array(mesh) if edges is None else edges).tobytes())
+    return digest.hexdigest()
+
+
+# Vertex neighbor lists are cached by topology, repeated smooths on the same mesh reuse them
+ADJACENCY_CACHE_SIZE = 8
+_adjacency_cache = OrderedDict()
+
+
+@profile_phase("adjacency")
+def get_vertex_adjacency(mesh):
+    """Return the cached (indptr, indices) neighbor lists of all mesh vertices in CSR layout"""
+    edges = read_edge_array(mesh)
+    key = mesh_topology_digest(mesh, edges)
+
+    adjacency = _adjacency_cache.get(key)
+    if adjacency is not None:
+        _adjacency_cache.move_to_end(key)
+        return adjacency
+
+    # Both directions of every edge, grouped by their start vertex
+    directed = np.concatenate([edges, edges[:, ::-1]])
+    order = np.argsort(directed[:, 0], kind='stable')
+    indptr = np.zeros(len(mesh.vertices) + 1, dtype=np.int64)
+    np.cumsum(np.bincount(directed[:, 0], minlength=len(mesh.vertices)), out=indptr[1:])
+    adjacency = (indptr, directed[order, 1])
+
+    _adjacency_cache[key] = adjacency
+    while len(_adjacency_cache) > ADJACENCY_CACHE_SIZE:
+        _adjacency_cache.popitem(last=False)
+    return adjacency
+
+
+# Mirror maps are cached by topology, vertex positions, axis and tolerance
+MIRROR_MAP_CACHE_SIZE = 8
+MIRROR_MAP_PROPERTY = "techanim_mirror_map"
+_mirror_map_cache = OrderedDict()
+
+
+@profile_phase("kd-tree")
+def build_mirror_map(coords, axis_index, tolerance):
+    """Index of the mirrored counterpart of every vertex, -1 where none lies within tolerance"""
+    kd = mathutils.kdtree.KDTree(len(coords))
+    for i, co in enumerate(coords.tolist()):
+        kd.insert(co, i)
+    kd.balance()
+
+    mirrored = coords.copy()
+    mirrored[:, axis_index] *= -1
+    mirror_map = np.full(len(coords), -1, dtype=np.int64)
+    for i, co in enumerate(mirrored.tolist()):
+        _, index, distance = kd.find(co)
+        if distance <= tolerance:
+            mirror_map[i] = index
+    return mirror_map
+
+
+@profile_phase("mirror map")
+def get_mirror_map(mesh, axis_index, tolerance, storage='MEMORY'):
+    """Return the cached mirror map of a mesh, building it with a KD-tree only on a cache miss
+
+    storage additionally persists the map as a mesh custom property ('PROPERTY')
+    or as a .npy file next to the saved .blend file ('FILE').
+    """
+    coords = read_vertex_coords(mesh)
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(mesh_topology_digest(mesh).encode())
+    digest.update(coords.tobytes())
+    digest.update(f"{axis_index}:{tolerance:.6g}".encode())
+    key = digest.hexdigest()
+
+    mirror_map = _mirror_map_cache.get(key)
+    if mirror_map is not None:
+        _mirror_map_cache.move_to_end(key)
+        return mirror_map
+
+    sidecar_path = None
+    if storage == 'FILE' and bpy.data.filepath:
+        sidecar_path = bpy.path.abspath(f"//{bpy.path.clean_name(mesh.name)}_mirror_{key}.npy")
+
+    stored = mesh.get(MIRROR_MAP_PROPERTY)
+    if storage == 'PROPERTY' and stored is not None and stored.get("key") == key:
+        mirror_map = np.array(stored["map"], dtype=np.int64)
+    elif sidecar_path and os.path.exists(sidecar_path):
+        mirror_map = np.load(sidecar_path)
+    else:
+        mirror_map = build_mirror_map(coords, axis_index, tolerance)
+        if storage == 'PROPERTY':
+            mesh[MIRROR_MAP_PROPERTY] = {"key": key, "map": mirror_map.tolist()}
+        elif sidecar_path:
+            np.save(sidecar_path, mirror_map)
+
+    _mirror_map_cache[key] = mirror_map
+    while len(_mirror_map_cache) > MIRROR_MAP_CACHE_SIZE:
+        _mirror_map_cache.popitem(last=False)
+    return mirror_map
+
+
+def nearest_indices(points, queries):
+    """Index of and distance to the nearest of points for every query point, using a KD-tree"""
+    kd = mathutils.kdtree.KDTree(len(points))
+    for i, co in enumerate(points.tolist()):
+        kd.insert(co, i)
+    kd.balance()
+
+    indices = np.empty(len(queries), dtype=np.int64)
+    distances = np.empty(len(queries), dtype=np.float32)
+    for i, co in enumerate(queries.tolist()):
+        _, indices[i], distances[i] = kd.find(co)
+    return indices, distances
+
+
+def iter_closest_surface_points(tree, queries, chunk_size=WEIGHT_CHUNK_SIZE):
+    """Closest point on a BVH tree's polygons for every query point, yields the fraction done after every chunk
+
+    Returns (polygon indices, locations).
+    """
+    polygons = np.empty(len(queries), dtype=np.int64)
+    locations = np.empty((len(queries), 3), dtype=np.float32)
+    for i, co in enumerate(queries.tolist(), 1):
+        location, _, polygons[i - 1], _ = tree.find_nearest(co)
+        locations[i - 1] = location
+        if i % chunk_size == 0:
+            yield i / len(queries)
+    return polygons, locations
+
+
+def mirror_pairs(mirror_map):
+    """Split a mirror map into (pairs_a, pairs_b) of vertices that are each other's mirror"""
+    indices = np.arange(len(mirror_map))
+    valid = mirror_map >= 0
+    mutual = np.zeros(len(mirror_map), dtype=bool)
+    mutual[valid] = mirror_map[mirror_map[valid]] == indices[valid]
+    pairs_a = np.flatnonzero(mutual & (indices < mirror_map))
+    return pairs_a, mirror_map[pairs_a]
+
+
+def mirror_group_permutation(vgroups):
+    """Index of the opposite side group (.L/.R, _l/_r, Left/Right) of every vertex group, itself if there is none"""
+    name_to_index = {vgroup.name: vgroup.index for vgroup in vgroups}
+    return np.array(
+        [name_to_index.get(bpy.utils.flip_name(vgroup.name), vgroup.index) for vgroup in vgroups],
+        dtype=np.int64,
+    )
+
+
+def normalize_rows(matrix):
+    """Normalize every non-zero row of a dense weight matrix in place"""
+    totals = matrix.sum(axis=1, keepdims=True)
+    np.divide(matrix, totals, out=matrix, where=totals > 0.0)
+    return matrix
+
+
+def limit_row_influences(matrix, max_influences):
+    """Zero all but the max_influences largest weights of every row of a dense weight matrix in place"""
+    if matrix.shape[1] > max_influences:
+        drop = np.argpartition(matrix, matrix.shape[1] - max_influences - 1, axis=1)[:, :matrix.shape[1] - max_influences]
+        np.put_along_axis(matrix, drop, 0.0, axis=1)
+    return matrix
+
+
+def segment_distances(points, heads, tails):
+    """Distance of every point to every head-tail segment, returns a (points x segments) array"""
+    axes = tails - heads
+    length_sq = np.maximum(np.einsum('ij,ij->i', axes, axes), 1e-12)
+    offsets = points[:, None, :] - heads[None, :, :]
+    t = np.clip(np.einsum('pbk,bk->pb', offsets, axes) / length_sq, 0.0, 1.0)
+    offsets -= t[:, :, None] * axes[None, :, :]
+    return np.sqrt(np.einsum('pbk,pbk->pb', offsets, offsets))
+
+
+def barycentric_weights(points, a, b, c):
+    """Barycentric coordinates of points on the triangles (a, b, c), all (points x 3) arrays
+
+    Points off the triangle plane are projected, coordinates are clamped to the
+    triangle so they are non-negative and sum to 1.
+    """
+    v0, v1, v2 = b - a, c - a, points - a
+    d00 = np.einsum('ij,ij->i', v0, v0)
+    d01 = np.einsum('ij,ij->i', v0, v1)
+    d11 = np.einsum('ij,ij->i', v1, v1)
+    d20 = np.einsum('ij,ij->i', v2, v0)
+    d21 = np.einsum('ij,ij->i', v2, v1)
+    denom = d00 * d11 - d01 * d01
+    degenerate = np.abs(denom) < 1e-12
+    denom = np.where(degenerate, 1.0, denom)
+
+    v = (d11 * d20 - d01 * d21) / denom
+    w = (d00 * d21 - d01 * d20) / denom
+    coords = np.column_stack([1.0 - v - w, v, w])
+    # Degenerate triangles take the first corner
+    coords[degenerate] = (1.0, 0.0, 0.0)
+    np.clip(coords, 0.0, None, out=coords)
+    return (coords / coords.sum(axis=1, keepdims=True)).astype(np.float32)
+
+
+# Falloff curves mapping a normalized distance in [0, 1] to [0, 1]
+FALLOFF_CURVES = {
+    'LINEAR': lambda t: t,
+    'SMOOTH': lambda t: t * t * (3.0 - 2.0 * t),
+    'SPHERE': lambda t: np.sqrt(t * (2.0 - t)),
+    'ROOT': np.sqrt,
+    'SHARP': np.square,
+}
+
+
+def csr_product(indptr, indices, num_cols):
+    """Return a function computing A @ X for the 0/1 CSR matrix A, SciPy backed when available"""
+    num_rows = len(indptr) - 1
+    if sparse is not None:
+        matrix = sparse.csr_matrix(
+            (np.ones(len(indices), dtype=np.float32), indices, indptr), shape=(num_rows, num_cols))
+        return lambda values: np.asarray(matrix @ values)
+
+    # Rows sorted by falling valence, so the rows having a k-th neighbor are a
+    # prefix and the product gathers one column per slot without padding
+    valence = np.diff(indptr)
+    order = np.argsort(-valence, kind='stable')
+    counts = np.count_nonzero(valence[:, None] > np.arange(valence.max(initial=0)), axis=0)
+    columns = [indices[indptr[order[:count]] + slot] for slot, count in enumerate(counts)]
+
+    def product(values):
+        gathered = np.zeros((num_rows,) + values.shape[1:], dtype=values.dtype)
+        for slot_columns in columns:
+            gathered[:len(slot_columns)] += values[slot_columns]
+        result = np.empty_like(gathered)
+        result[order] = gathered
+        return result
+    return product
+
+
+def csr_from_entries(rows, cols, values, num_rows):
+    """CSR (indptr, indices, values) of a square sparse matrix given as entries, duplicate entries are summed"""
+    keys, inverse = np.unique(rows.astype(np.int64) * num_rows + cols, return_inverse=True)
+    summed = np.bincount(inverse, weights=values, minlength=len(keys))
+    indptr = np.zeros(num_rows + 1, dtype=np.int64)
+    np.cumsum(np.bincount(keys // num_rows, minlength=num_rows), out=indptr[1:])
+    return indptr, keys % num_rows, summed
+
+
+def cotangent_laplacian(coords, triangles):
+    """Cotangent Laplacian of a triangle mesh in CSR layout and the lumped area of every vertex
+
+    Returns (indptr, indices, values, areas). The Laplacian is positive
+    semi-definite, an edge opposite the angles a and b gets -(cot a + cot b) / 2,
+    and every row has a diagonal entry, also for vertices without triangles.
+    """
+    num_vertices = len(coords)
+    corners = coords[triangles].astype(np.float64)
+    # The edges leaving every corner, the corner's angle lies between them
+    to_next = corners[:, [1, 2, 0]] - corners
+    to_prev = corners[:, [2, 0, 1]] - corners
+    double_areas = np.linalg.norm(np.cross(to_next, to_prev), axis=2)
+    dots = np.einsum('tkd,tkd->tk', to_next, to_prev)
+    cotangents = np.divide(dots, double_areas, out=np.zeros_like(dots), where=double_areas > 1e-12)
+
+    # The angle of corner k is opposite the edge between corners k + 1 and k + 2
+    heads = triangles[:, [1, 2, 0]].ravel()
+    tails = triangles[:, [2, 0, 1]].ravel()
+    halves = 0.5 * cotangents.ravel()
+    diagonal = np.arange(num_vertices)
+    indptr, indices, values = csr_from_entries(
+        np.concatenate([heads, tails, heads, tails, diagonal]),
+        np.concatenate([tails, heads, heads, tails, diagonal]),
+        np.concatenate([-halves, -halves, halves, halves, np.zeros(num_vertices)]),
+        num_vertices,
+    )
+    areas = np.bincount(triangles.ravel(), weights=np.repeat(double_areas[:, 0] / 6, 3), minlength=num_vertices)
+    return indptr, indices, values, areas
+
+
+def solve_spd(indptr, indices, values, rhs, x0=None, tolerance=1e-5, max_iterations=2000):
+    """Solve A X = B for a symmetric positive definite CSR matrix A and all columns of B at once"""
+    return run_to_end(iter_solve_spd(indptr, indices, values, rhs, x0, tolerance, max_iterations))
+
+
+def iter_solve_spd(indptr, indices, values, rhs, x0=None, tolerance=1e-5, max_iterations=2000):
+    """Chunked solve_spd, yields the fraction of the way to convergence after every iteration
+
+    SciPy factorizes A once and reuses the factorization for every column;
+    without SciPy a Jacobi preconditioned conjugate gradient runs in float32
+    on the columns that have not converged yet, starting from x0, and stops
+    after max_iterations.
+    """
+    num_rows = len(indptr) - 1
+    if sparse is not None:
+        matrix = sparse.csr_matrix((values, indices, indptr), shape=(num_rows, num_rows)).tocsc()
+        return sparse_linalg.splu(matrix).solve(rhs)
+
+    rows = entry_rows(indptr)
+    diagonal = np.zeros(num_rows, dtype=np.float32)
+    on_diagonal = rows == indices
+    diagonal[rows[on_diagonal]] = values[on_diagonal]
+    diagonal = diagonal[:, None]
+
+    # Rows padded to the same width, the product gathers slot by slot; padding
+    # entries point at row 0 with a zero value
+    slots = np.arange(len(indices)) - indptr[rows]
+    columns = np.zeros((int(np.diff(indptr).max(initial=1)), num_rows), dtype=np.int64)
+    columns[slots, rows] = indices
+    padded = np.zeros(columns.shape, dtype=np.float32)
+    padded[slots, rows] = values
+
+    def product(x):
+        result = padded[0][:, None] * x[columns[0]]
+        for slot in range(1, len(columns)):
+            result += padded[slot][:, None] * x[columns[slot]]
+        return result
+
+    rhs = rhs.astype(np.float32)
+    solution = np.zeros_like(rhs) if x0 is None else x0.astype(np.float32)
+    active = np.arange(rhs.shape[1])
+    x = solution.copy()
+    residual = rhs - product(x)
+    preconditioned = residual / diagonal
+    direction = preconditioned.copy()
+    rz = np.einsum('ij,ij->j', residual, preconditioned)
+    # Convergence is measured on the Jacobi scaled residual, rows can differ by orders of magnitude
+    limits = tolerance * np.maximum(np.linalg.norm(rhs / diagonal, axis=0), 1e-30)
+    norms = np.linalg.norm(preconditioned, axis=0)
+    log_span = np.log(np.maximum(norms / limits, 1.0 + 1e-6))
+    for _ in range(max_iterations):
+        # Converged columns are stored and dropped from the iteration
+        converged = norms <= limits
+        if converged.any():
+            solution[:, active[converged]] = x[:, converged]
+            kept = ~converged
+            if not kept.any():
+                return solution
+            active = active[kept]
+            x, residual, preconditioned, direction = x[:, kept], residual[:, kept], preconditioned[:, kept], direction[:, kept]
+            rz, limits, norms, log_span = rz[kept], limits[kept], norms[kept], log_span[kept]
+        yield float(np.clip(1.0 - np.log(norms / limits) / log_span, 0.0, 1.0).min())
+
+        step = product(direction)
+        alpha = rz / np.maximum(np.einsum('ij,ij->j', direction, step), 1e-30)
+        x += alpha * direction
+        residual -= alpha * step
+        np.divide(residual, diagonal, out=preconditioned)
+        new_rz = np.einsum('ij,ij->j', residual, preconditioned)
+        direction *= new_rz / np.maximum(rz, 1e-30)
+        direction += preconditioned
+        rz = new_rz
+        norms = np.linalg.norm(preconditioned, axis=0)
+    solution[:, active] = x
+    return solution
+
+
+# Iteration cap of the NumPy heat solve, the weights reached by then are used
+HEAT_MAX_ITERATIONS = 1000
+
+
+def bone_heat_weights(coords, triangles, heads, tails, heat_weight=1.0, x0=None):
+    """Heat diffusion weights of head-tail bone segments over a triangle mesh, a (vertices x bones) array"""
+    return run_to_end(iter_bone_heat_weights(coords, triangles, heads, tails, heat_weight, x0))
+
+
+def iter_bone_heat_weights(coords, triangles, heads, tails, heat_weight=1.0, x0=None):
+    """Chunked bone_heat_weights, yields the solver progress
+
+    Solves (L + M H) w = M H p with the cotangent Laplacian L, the vertex
+    areas M, H = heat_weight / d^2 for the distance d to the nearest bone and
+    p = 1 for the nearest bone. The system is the same for all bones. x0
+    holds start values for the NumPy solver, e.g. an earlier solution, NaN
+    columns start from p.
+    """
+    indptr, indices, values, areas = cotangent_laplacian(coords, triangles)
+    distances = segment_distances(coords, heads, tails).astype(np.float64)
+    nearest = distances.min(axis=1)
+    closest = distances <= nearest[:, None] * (1.0 + 1e-4) + 1e-9
+    sources = closest / closest.sum(axis=1, keepdims=True)
+
+    # Vertices without triangles only take the heat of their nearest bone,
+    # vertices on a bone are held close to it without an infinite heat
+    mass = np.maximum(areas, max(areas.mean(), 1e-12) * 1e-6)
+    min_distance = max(np.ptp(coords, axis=0).max() * 1e-4, 1e-6)
+    heat = mass * heat_weight / np.maximum(nearest, min_distance) ** 2
+    rows = entry_rows(indptr)
+    values = values + np.where(rows == indices, heat[rows], 0.0)
+    start = sources if x0 is None else np.where(np.isnan(x0), sources, x0)
+    return (yield from iter_solve_spd(indptr, indices, values, heat[:, None] * sources, x0=start, max_iterations=HEAT_MAX_ITERATIONS))
+
+
+class WeightMatrix:
+    """Vertex group weights of a mesh object in CSR layout
+
+    indptr[v]:indptr[v + 1] spans the entries of vertex v in groups (int32)
+    and weights (float32). The operations work on the whole matrix at once and
+    commit() writes back only the entries that differ from the loaded snapshot.
+    A matrix loaded for a subset of the mesh keeps the mesh index of every
+    row in vertices.
+    """
+
+    def __init__(self, indptr, groups, weights, num_groups, vertices=None):
+        self.num_groups = num_groups
+        self.vertices = vertices
+        self._set_csr(indptr, groups, weights)
+        self._snapshot = (self.rows, self.groups, self.weights)
+        self._loaded = self._snapshot
+        self._written = False
+
+    @classmethod
+    def from_object(cls, obj, vertices=None):
+        """Load the weights of all vertex groups of a mesh object, only of the given vertices if any"""
+        return run_to_end(cls.iter_from_object(obj, vertices))
+
+    @classmethod
+    def iter_from_object(cls, obj, vertices=None):
+        """Chunked from_object, yields the fraction of vertices read"""
+        if vertices is not None:
+            vertices = np.asarray(vertices, dtype=np.int64)
+        indptr, groups, weights = yield from iter_read_vertex_weights(obj, vertices)
+        return cls(indptr, groups, weights, len(obj.vertex_groups), vertices)
+
+    @property
+    def num_vertices(self):
+        return len(self.indptr) - 1
+
+    def _set_csr(self, indptr, groups, weights):
+        self.indptr = indptr
+        self.groups = groups
+        self.weights = weights
+        self.rows = entry_rows(indptr)
+
+    def _set_entries(self, rows, groups, weights):
+        """Rebuild the CSR layout from unordered (vertex, group, weight) entries"""
+        order = np.argsort(rows, kind='stable')
+        indptr = np.zeros(self.num_vertices + 1, dtype=np.int64)
+        np.cumsum(np.bincount(rows, minlength=self.num_vertices), out=indptr[1:])
+        self._set_csr(indptr, groups[order].astype(np.int32), weights[order].astype(np.float32))
+
+    def _filter(self, keep):
+        indptr = np.zeros_like(self.indptr)
+        np.cumsum(np.bincount(self.rows[keep], minlength=self.num_vertices), out=indptr[1:])
+        self._set_csr(indptr, self.groups[keep], self.weights[keep])
+        return self
+
+    def local_rows(self, vertices):
+        """Matrix rows of the given mesh vertices"""
+        if self.vertices is None:
+            return np.asarray(vertices)
+        sorter = np.argsort(self.vertices)
+        return sorter[np.searchsorted(self.vertices, vertices, sorter=sorter)]
+
+    def influence_counts(self):
+        """Number of weights of every vertex"""
+        return np.diff(self.indptr)
+
+    @profile_phase("compute")
+    def normalize(self):
+        """Scale the weights of every vertex with a non-zero total to sum to 1"""
+        totals = np.repeat(csr_row_sums(self.indptr, self.weights), self.influence_counts())
+        self.weights = np.divide(self.weights, totals, out=self.weights.copy(), where=totals > 0.0).astype(np.float32)
+        return self
+
+    @profile_phase("compute")
+    def limit(self, max_influences):
+        """Keep only the max_influences largest weights of every vertex"""
+        return self._filter(limit_entry_influences(self.indptr, self.weights, max_influences))
+
+    @profile_phase("compute")
+    def threshold(self, value):
+        """Remove all weights below value"""
+        return self._filter(self.weights >= value)
+
+    @profile_phase("compute")
+    def quantize(self, levels):
+        """Round the weights of every vertex to multiples of 1 / levels that sum exactly to 1, weights rounded to 0 are removed"""
+        quantized = quantize_entries(self.indptr, self.weights, levels)
+        self.weights = (quantized / levels).astype(np.float32)
+        return self._filter(quantized > 0)
+
+    def to_dense(self, vertices=None, groups=None):
+        """Dense (vertices x groups) weight block, all vertices or groups when omitted"""
+        vertices = np.arange(self.num_vertices) if vertices is None else np.asarray(vertices)
+        groups = np.arange(self.num_groups) if groups is None else np.asarray(groups)
+        row_lookup = np.full(self.num_vertices, -1, dtype=np.int64)
+        row_lookup[vertices] = np.arange(len(vertices))
+        col_lookup = np.full(max(self.num_groups, 1), -1, dtype=np.int64)
+        col_lookup[groups] = np.arange(len(groups))
+
+        local_rows = row_lookup[self.rows]
+        local_cols = col_lookup[self.groups]
+        inside = (local_rows >= 0) & (local_cols >= 0)
+        matrix = np.zeros((len(vertices), len(groups)), dtype=np.float32)
+        matrix[local_rows[inside], local_cols[inside]] = self.weights[inside]
+        return matrix
+
+    @profile_phase("compute")
+    def set_dense(self, vertices, matrix, groups=None, keep_zeros=False):
+        """Replace the weights of the given vertices and groups with a dense block
+
+        Zero weights become removals unless keep_zeros is set.
+        """
+        vertices = np.asarray(vertices)
+        groups = np.arange(self.num_groups) if groups is None else np.asarray(groups)
+        self.num_groups = max(self.num_groups, int(groups.max()) + 1 if len(groups) else 0)
+
+        in_vertices = np.zeros(self.num_vertices, dtype=bool)
+        in_vertices[vertices] = True
+        in_groups = np.zeros(self.num_groups, dtype=bool)
+        in_groups[groups] = True
+        kept = ~(in_vertices[self.rows] & in_groups[self.groups])
+
+        if keep_zeros:
+            new_rows, new_cols = np.nonzero(np.ones(matrix.shape, dtype=bool))
+        else:
+            new_rows, new_cols = np.nonzero(matrix)
+        self._set_entries(
+            np.concatenate([self.rows[kept], vertices[new_rows]]),
+            np.concatenate([self.groups[kept], groups[new_cols]]),
+            np.concatenate([self.weights[kept], matrix[new_rows, new_cols]]),
+        )
+        return self
+
+    @profile_phase("compute")
+    def mirror(self, pairs_a, pairs_b, group_perm=None, center=None):
+        """Average the weights of mirrored vertex pairs
+
+        group_perm maps every group to its opposite side group; center lists
+        vertices on the symmetry plane that are averaged with their own swap.
+        """
+        if group_perm is None:
+            group_perm = np.arange(self.num_groups)
+        if center is None:
+            center = np.zeros(0, dtype=np.int64)
+
+        # Dense block limited to the touched vertices and the used groups with their swaps
+        used = np.unique(self.groups)
+        used = np.union1d(used, group_perm[used])
+        local_perm = np.searchsorted(used, group_perm[used])
+        vertices = np.concatenate([pairs_a, pairs_b, center])
+        matrix = self.to_dense(vertices, used)
+
+        num_pairs = len(pairs_a)
+        side_a = matrix[:num_pairs]
+        side_b = matrix[num_pairs:2 * num_pairs]
+        average = (side_a + side_b[:, local_perm]) / 2
+        matrix[:num_pairs] = average
+        matrix[num_pairs:2 * num_pairs] = average[:, local_perm]
+
+        middle = matrix[2 * num_pairs:]
+        matrix[2 * num_pairs:] = (middle + middle[:, local_perm]) / 2
+        return self.set_dense(vertices, matrix, used)
+
+    @profile_phase("compute")
+    def smooth(self, adjacency, iterations, threshold=0.0):
+        """Average the selected vertices with their neighbors, the surrounding ring stays fixed
+
+        adjacency is the (region, indptr, indices) tuple of build_selection_adjacency,
+        weights falling below threshold are removed after every iteration.
+        Only the groups with weights in the region take part.
+        """
+        region, indptr, indices = adjacency
+        region = self.local_rows(region)
+        num_selected = len(indptr) - 1
+        neighbor_sum = csr_product(indptr, indices, len(region))
+        valence = np.diff(indptr).astype(np.float32)[:, None]
+        has_neighbors = valence > 0
+
+        in_region = np.zeros(self.num_vertices, dtype=bool)
+        in_region[region] = True
+        groups = np.unique(self.groups[in_region[self.rows]])
+
+        matrix = self.to_dense(region, groups)
+        original = matrix[:num_selected].copy()
+        for iteration in range(iterations):
+            average = neighbor_sum(matrix) / np.maximum(valence, 1.0)
+            smoothed = np.where(has_neighbors, (matrix[:num_selected] + average) / 2, matrix[:num_selected])
+            smoothed[smoothed < threshold] = 0.0
+            matrix[:num_selected] = smoothed
+
+        # Only the groups that changed are replaced
+        changed = np.flatnonzero((matrix[:num_selected] != original).any(axis=0))
+        return self.set_dense(region[:num_selected], matrix[:num_selected][:, changed], groups[changed])
+
+    @profile_phase("compute")
+    def replace_groups(self, groups, indptr, entry_groups, entry_weights):
+        """Replace all weights of the given groups with new CSR weights of every vertex"""
+        in_groups = np.zeros(max(self.num_groups, int(np.max(groups, initial=-1)) + 1), dtype=bool)
+        in_groups[groups] = True
+        self.num_groups = len(in_groups)
+        kept = ~in_groups[self.groups]
+        self._set_entries(
+            np.concatenate([self.rows[kept], entry_rows(indptr)]),
+            np.concatenate([self.groups[kept], entry_groups]),
+            np.concatenate([self.weights[kept], entry_weights]),
+        )
+        return self
+
+    @profile_phase("compute")
+    def merge_groups(self, group_map):
+        """Move the weights of every group g into group_map[g], weights meeting in one group are summed and clamped to 1"""
+        stride = max(self.num_groups, 1)
+        keys, inverse = np.unique(self.rows.astype(np.int64) * stride + np.asarray(group_map)[self.groups], return_inverse=True)
+        summed = np.minimum(np.bincount(inverse, weights=self.weights, minlength=len(keys)), 1.0)
+        self._set_entries(keys // stride, keys % stride, summed)
+        return self
+
+    def commit(self, obj):
+        """Write the changes since loading (or the last commit) back to the object's vertex groups
+
+        Returns (num_removed, num_written).
+        """
+        return run_to_end(self.iter_commit(obj))
+
+    def iter_commit(self, obj):
+        """Chunked commit, yields the fraction of vertex group calls done"""
+        old_entries = self._mesh_entries(*self._snapshot)
+        new_entries = self._mesh_entries(self.rows, self.groups, self.weights)
+        self._written = True
+        result = yield from iter_write_vertex_weights(obj, *old_entries, *new_entries)
+        self._snapshot = (self.rows, self.groups, self.weights)
+        return result
+
+    def rollback(self, obj):
+        """Restore the weights as loaded after a finished or interrupted commit"""
+        if self._written:
+            written_entries = self._mesh_entries(self.rows, self.groups, self.weights)
+            write_vertex_weights(obj, *written_entries, *self._mesh_entries(*self._loaded))
+            self._snapshot = self._loaded
+            self._written = False
+
+    def _mesh_entries(self, rows, groups, weights):
+        """Entries with the mesh index of their vertex"""
+        return (rows if self.vertices is None else self.vertices[rows]), groups, weights
+
+
+# Weight snapshots store the CSR weights, the group names and the vertex
+# positions of a mesh, either in one compressed .npz file or as plain .npy
+# files in a folder that np.load can memory-map.
+WEIGHT_SNAPSHOT_ARRAYS = ("indptr", "groups", "weights", "group_names", "coords")
+WEIGHT_SNAPSHOT_FOLDER_EXT = ".weights"
+
+
+def save_weight_snapshot(path, obj, weight_matrix, memory_mappable=False):
+    """Save the weights of a mesh object, returns the path written"""
+    arrays = {
+        "indptr": weight_matrix.indptr,
+        "groups": weight_matrix.groups,
+        "weights": weight_matrix.weights,
+        "group_names": np.array([vgroup.name for vgroup in obj.vertex_groups], dtype=np.str_),
+        "coords": read_vertex_coords(obj.data),
+    }
+    if not memory_mappable:
+        np.savez_compressed(path, **arrays)
+        return path
+
+    folder = os.path.splitext(path)[0] + WEIGHT_SNAPSHOT_FOLDER_EXT
+    os.makedirs(folder, exist_ok=True)
+    for name, values in arrays.items():
+        np.save(os.path.join(folder, f"{name}.npy"), values)
+    return folder
+
+
+def load_weight_snapshot(path):
+    """Load a weight snapshot from an .npz file, or memory-mapped from a snapshot folder or a file in it"""
+    if path.lower().endswith(".npz"):
+        with np.load(path) as data:
+            return {name: data[name] for name in WEIGHT_SNAPSHOT_ARRAYS}
+
+    folder = path if os.path.isdir(path) else os.path.dirname(path)
+    return {name: np.load(os.path.join(folder, f"{name}.npy"), mmap_mode='r') for name in WEIGHT_SNAPSHOT_ARRAYS}
+
+
+# Weight analysis reports of the last analyzed mesh objects by name, drawn in the panel
+_weight_reports = {}
+WEIGHT_PROBLEMS = ("over_limit", "unnormalized", "unweighted", "asymmetric")
+
+
+def weight_asymmetry(weight_matrix, mirror_map, group_perm):
+    """Largest difference of every vertex's weights to its mirrored vertex's weights in the opposite side groups
+
+    Vertices without a mirrored counterpart get NaN.
+    """
+    rows = weight_matrix.rows
+    groups = weight_matrix.groups.astype(np.int64)
+    stride = max(weight_matrix.num_groups, 1)
+    mirrored = mirror_map[rows] >= 0
+
+    # Every weight minus the weight its counterpart puts in the swapped group, missing weights count as 0
+    keys = np.concatenate([
+        rows[mirrored] * stride + groups[mirrored],
+        mirror_map[rows[mirrored]] * stride + group_perm[groups[mirrored]],
+    ])
+    values = np.concatenate([weight_matrix.weights[mirrored], -weight_matrix.weights[mirrored]])
+    keys, inverse = np.unique(keys, return_inverse=True)
+    difference = np.abs(np.bincount(inverse, weights=values, minlength=len(keys)))
+
+    asymmetry = np.zeros(weight_matrix.num_vertices, dtype=np.float64)
+    if len(keys):
+        key_rows = keys // stride
+        starts = np.flatnonzero(np.r_[True, key_rows[1:] != key_rows[:-1]])
+        asymmetry[key_rows[starts]] = np.maximum.reduceat(difference, starts)
+    asymmetry[mirror_map < 0] = np.nan
+    return asymmetry
+
+
+@profile_phase("compute")
+def analyze_weights(weight_matrix, group_names, max_influences, epsilon=1e-4, bone_names=None,
+                    mirror_map=None, group_perm=None, symmetry_tolerance=0.01):
+    """Weight quality statistics of a WeightMatrix, it is not modified
+
+    Returns (report, masks): report holds the counts and group lists shown in
+    the panel, masks the vertex mask of every checked problem in WEIGHT_PROBLEMS.
+    Asymmetry is only checked with a mirror map, groups without a bone only
+    with bone names.
+    """
+    counts = weight_matrix.influence_counts()
+    totals = csr_row_sums(weight_matrix.indptr, weight_matrix.weights)
+    unweighted = totals <= epsilon
+    masks = {
+        "over_limit": counts > max_influences,
+        "unnormalized": ~unweighted & (np.abs(totals - 1.0) > epsilon),
+        "unweighted": unweighted,
+    }
+    if mirror_map is not None:
+        # NaN compares False, vertices without a counterpart are not asymmetric
+        with np.errstate(invalid='ignore'):
+            masks["asymmetric"] = weight_asymmetry(weight_matrix, mirror_map, group_perm) > symmetry_tolerance
+
+    group_use = np.bincount(weight_matrix.groups[weight_matrix.weights > epsilon], minlength=len(group_names))
+    report = {
+        "vertices": weight_matrix.num_vertices,
+        "histogram": np.bincount(counts).tolist(),
+        "empty_groups": [name for name, used in zip(group_names, group_use) if not used],
+        "unbound_groups": None if bone_names is None else [name for name in group_names if name not in bone_names],
+        "unmatched": None if mirror_map is None else int((mirror_map < 0).sum()),
+    }
+    for name in WEIGHT_PROBLEMS:
+        report[name] = int(masks[name].sum()) if name in masks else None
+    return report, masks
+
+
+# Packed influence buffers for engine exporters, little-endian:
+#   magic, uint32 version, vertex count, influences per vertex, bytes per index,
+#   bytes per weight, byte length of the group names, the names as newline
+#   separated UTF-8, then the (vertices x influences) index and weight arrays.
+PACKED_WEIGHTS_MAGIC = b"TAFW"
+PACKED_WEIGHTS_VERSION = 1
+
+
+def save_packed_weights(path, indices, weights, group_names):
+    """Write packed influence arrays from pack_influences() to a binary file"""
+    names = "\n".join(group_names).encode("utf-8")
+    header = np.array(
+        [PACKED_WEIGHTS_VERSION, indices.shape[0], indices.shape[1], indices.itemsize, weights.itemsize, len(names)],
+        dtype='<u4')
+    with open(path, "wb") as packed_file:
+        packed_file.write(PACKED_WEIGHTS_MAGIC)
+        packed_file.write(header.tobytes())
+        packed_file.write(names)
+        packed_file.write(np.ascontiguousarray(indices).tobytes())
+        packed_file.write(np.ascontiguousarray(weights).tobytes())
+
+
+# Bulk pose helpers. Matrix arrays are (..., 4, 4) in row-major order like mathutils.
+def read_matrix_array(collection, attribute):
+    """Read a matrix property of every item of a bpy collection as a (items x 4 x 4) array"""
+    values = np.empty(len(collection) * 16, dtype=np.float32)
+    collection.foreach_get(attribute, values)
+    # foreach_get flattens matrices column by column
+    return values.reshape(-1, 4, 4).transpose(0, 2, 1)
+
+
+def bone_levels(parents):
+    """Topological order of a bone hierarchy as one index array per depth, parents come before their children
+
+    parents holds the parent index of every bone, -1 for roots.
+    """
+    depth = np.zeros(len(parents), dtype=np.int64)
+    has_parent = parents >= 0
+    for _ in range(len(parents)):
+        new_depth = np.where(has_parent, depth[parents] + 1, 0)
+        if np.array_equal(new_depth, depth):
+            break
+        depth = new_depth
+    order = np.argsort(depth, kind='stable')
+    return np.split(order, np.flatnonzero(np.diff(depth[order])) + 1)
+
+
+@profile_phase("compute")
+def pose_to_basis(armature, bone_names, pose_matrices):
+    """Convert armature space pose matrices of the named bones into their matrix_basis
+
+    pose_matrices is a (..., bones x 4 x 4) array. The other bones keep their
+    matrix_basis and follow the new pose of their parents. The hierarchy is
+    walked one depth level at a time, each level as one batch.
+    """
+    bones = armature.data.bones
+    bone_index = {bone.name: i for i, bone in enumerate(bones)}
+    parents = np.array([bone_index[bone.parent.name] if bone.parent else -1 for bone in bones], dtype=np.int64)
+    rest = read_matrix_array(bones, 'matrix_local')
+    pose_order = np.array([bone_index[pose_bone.name] for pose_bone in armature.pose.bones], dtype=np.int64)
+
+    # Rest matrix of every bone relative to its parent, pose = parent_pose @ local_rest @ basis
+    has_parent = parents >= 0
+    local_rest = rest.copy()
+    local_rest[has_parent] = np.linalg.inv(rest[parents[has_parent]]) @ rest[has_parent]
+
+    targets = np.array([bone_index[name] for name in bone_names], dtype=np.int64)
+    is_target = np.zeros(len(bones), dtype=bool)
+    is_target[targets] = True
+    batch_shape = pose_matrices.shape[:-3]
+    basis = np.empty_like(rest)
+    basis[pose_order] = read_matrix_array(armature.pose.bones, 'matrix_basis')
+    basis = np.broadcast_to(basis, batch_shape + rest.shape).copy()
+    poses = np.empty_like(basis)
+    poses[..., targets, :, :] = pose_matrices
+
+    for level in bone_levels(parents):
+        level_parents = parents[level]
+        with_parent = level_parents >= 0
+        parent_pose = np.broadcast_to(np.eye(4, dtype=np.float32), batch_shape + (len(level), 4, 4)).copy()
+        parent_pose[..., with_parent, :, :] = poses[..., level_parents[with_parent], :, :]
+        relative = parent_pose @ local_rest[level]
+
+        converted = is_target[level]
+        kept = level[~converted]
+        poses[..., kept, :, :] = relative[..., ~converted, :, :] @ basis[..., kept, :, :]
+        basis[..., level[converted], :, :] = np.linalg.inv(relative[..., converted, :, :]) @ poses[..., level[converted], :, :]
+    return basis[..., targets, :, :]
+
+
+def matrices_to_quaternions(rotations):
+    """Convert (..., 3 x 3) rotation matrices to (..., 4) WXYZ quaternions"""
+    m = rotations
+    diagonal = np.stack([
+        1.0 + m[..., 0, 0] + m[..., 1, 1] + m[..., 2, 2],
+        1.0 + m[..., 0, 0] - m[..., 1, 1] - m[..., 2, 2],
+        1.0 - m[..., 0, 0] + m[..., 1, 1] - m[..., 2, 2],
+        1.0 - m[..., 0, 0] - m[..., 1, 1] + m[..., 2, 2],
+    ], axis=-1)
+    quats = np.sqrt(np.maximum(diagonal, 0.0)) / 2
+    quats[..., 1] = np.copysign(quats[..., 1], m[..., 2, 1] - m[..., 1, 2])
+    quats[..., 2] = np.copysign(quats[..., 2], m[..., 0, 2] - m[..., 2, 0])
+    quats[..., 3] = np.copysign(quats[..., 3], m[..., 1, 0] - m[..., 0, 1])
+    return quats / np.linalg.norm(quats, axis=-1, keepdims=True)
+
+
+def decompose_matrices(matrices):
+    """Split (..., 4 x 4) matrices into locations, WXYZ quaternions, scales and rotation matrices"""
+    locations = matrices[..., :3, 3]
+    scales = np.linalg.norm(matrices[..., :3, :3], axis=-2)
+    rotations = matrices[..., :3, :3] / np.where(scales > 0.0, scales, 1.0)[..., None, :]
+    return locations, matrices_to_quaternions(rotations), scales, rotations
+
+
+@profile_phase("write keys")
+def write_fcurve_keys(action, data_path, index, group_name, frames, values):
+    """Replace an F-curve's keys with one bulk foreach_set, no per-key keyframe_insert"""
+    fcurve = action.fcurves.find(data_path, index=index)
+    if fcurve is None:
+        fcurve = action.fcurves.new(data_path, index=index, action_group=group_name)
+    else:
+        fcurve.keyframe_points.clear()
+
+    coords = np.empty(len(frames) * 2, dtype=np.float32)
+    coords[0::2] = frames
+    coords[1::2] = values
+    fcurve.keyframe_points.add(len(frames))
+    fcurve.keyframe_points.foreach_set('co', coords)
+    fcurve.update()
+    return fcurve
+
+
+def read_vector_array(collection, attribute, size=3):
+    """Read a float vector property of every item of a bpy collection as an (items x size) array"""
+    values = np.empty(len(collection) * size, dtype=np.float32)
+    collection.foreach_get(attribute, values)
+    return values.reshape(-1, size)
+
+
+def snap_connected_bones(edit_bones, bone_index, heads, tails, moved):
+    """Rejoin connected edit bones in the head and tail arrays after the bones at the moved indices changed
+
+    A moved child pulls the tail of a parent that did not move, every other
+    connected child snaps its head to the parent's tail.
+    """
+    connected = np.zeros(len(edit_bones), dtype=bool)
+    edit_bones.foreach_get('use_connect', connected)
+    parents = np.array(
+        [bone_index[bone.parent.name] if bone.parent else -1 for bone in edit_bones], dtype=np.int64)
+    connected &= parents >= 0
+    if not connected.any():
+        return
+    is_moved = np.zeros(len(edit_bones), dtype=bool)
+    is_moved[moved] = True
+
+    children = np.flatnonzero(connected)
+    pulling = children[is_moved[children] & ~is_moved[parents[children]]]
+    tails[parents[pulling]] = heads[pulling]
+    heads[children] = tails[parents[children]]
+
+# Bone name mapping between rigs with different naming conventions, cached per
+# pair of bone name lists and remap rules
+BONE_MAP_CACHE_SIZE = 32
+_bone_map_cache = OrderedDict()
+
+_SIDE_SUFFIX = re.compile(r"[._\- ](l|r|left|right)$", re.IGNORECASE)
+_SIDE_PREFIX = re.compile(r"^(l|r|left|right)[._\- ]", re.IGNORECASE)
+_SIDE_WORD_PREFIX = re.compile(r"^(left|right)(?=[A-Z0-9])|^(Left|Right)(?=[A-Z0-9_.])")
+
+
+def normalize_bone_name(name):
+    """Naming convention independent key of a bone name: no namespace prefix, canonical side, lowercase"""
+    name = name.rsplit(":", 1)[-1]
+    side = ""
+    for pattern in (_SIDE_SUFFIX, _SIDE_PREFIX, _SIDE_WORD_PREFIX):
+        match = pattern.search(name)
+        if match:
+            side = match.group(0).strip("._- ")[0].lower()
+            name = name[:match.start()] + name[match.end():]
+            break
+    return side + ":" + re.sub(r"[^a-z0-9]", "", name.lower())
+
+
+def parse_bone_remap(text):
+    """Parse 'donor=recipient, donor=recipient' remap rules into a dict"""
+    remap = {}
+    for rule in text.split(","):
+        donor_name, _, recipient_name = rule.partition("=")
+        if donor_name.strip() and recipient_name.strip():
+            remap[donor_name.strip()] = recipient_name.strip()
+    return remap
+
+
+def build_bone_map(donor_names, recipient_names, remap=None):
+    """Match donor bones to recipient bones, returns a list of (donor name, recipient name)
+
+    Matching runs through user remap rules, exact names, names without a
+    namespace prefix (mixamorig:) and side normalized names (_l, .L, Left),
+    every recipient bone is used at most once.
+    """
+    matches = {}
+    used = set()
+    recipient_set = set(recipient_names)
+
+    def match_by(key):
+        candidates = {}
+        for name in recipient_names:
+            if name not in used:
+                candidates.setdefault(key(name), []).append(name)
+        for donor_name in donor_names:
+            if donor_name in matches:
+                continue
+            found = candidates.get(key(donor_name))
+            # Ambiguous keys are left to the stricter rules or the user's remap
+            if found and len(found) == 1 and found[0] not in used:
+                matches[donor_name] = found[0]
+                used.add(found[0])
+
+    for donor_name, recipient_name in (remap or {}).items():
+        if donor_name in donor_names and recipient_name in recipient_set and recipient_name not in used:
+            matches[donor_name] = recipient_name
+            used.add(recipient_name)
+    match_by(lambda name: name)
+    match_by(lambda name: name.rsplit(":", 1)[-1])
+    match_by(normalize_bone_name)
+
+    return [(name, matches[name]) for name in donor_names if name in matches]
+
+
+@profile_phase("bone map")
+def get_bone_map(donor, recipient, remap_text=""):
+    """Cached donor to recipient bone mapping of two armature objects"""
+    donor_names = tuple(bone.name for bone in donor.data.bones)
+    recipient_names = tuple(bone.name for bone in recipient.data.bones)
+    key = (donor_names, recipient_names, remap_text)
+
+    bone_map = _bone_map_cache.get(key)
+    if bone_map is None:
+        bone_map = build_bone_map(donor_names, recipient_names, parse_bone_remap(remap_text))
+        _bone_map_cache[key] = bone_map
+        while len(_bone_map_cache) > BONE_MAP_CACHE_SIZE:
+            _bone_map_cache.popitem(last=False)
+    else:
+        _bone_map_cache.move_to_end(key)
+    return bone_map
+
+
+def scene_bone_remap(context):
+    """User remap rules stored on the scene"""
+    return getattr(context.scene, "techanim_bone_remap", "")
+
+
+# Constraints created by the addon carry a name prefix and a per armature donor index,
+# and are tracked in a {bone name: {constraint name: donor name}} custom property
+CONSTRAINT_PREFIX = "TAF_"
+CONSTRAINT_REGISTRY = "techanim_constraints"
+
+
+def constraint_registry(armature):
+    """Tracked constraints of an armature object as a plain dict"""
+    registry = armature.get(CONSTRAINT_REGISTRY)
+    return registry.to_dict() if registry is not None else {}
+
+
+def tracked_constraint_name(registry, donor_name):
+    """Name of the constraints towards donor_name in a registry, the next free index for a new donor
+
+    The donor stays in the registry, not in the name, so names stay short of
+    Blender's 63 byte limit.
+    """
+    donors = {name: donor for tracked in registry.values() for name, donor in tracked.items()}
+    for name, donor in donors.items():
+        if donor == donor_name:
+            return name
+    index = 0
+    while f"{CONSTRAINT_PREFIX}{index}" in donors:
+        index += 1
+    return f"{CONSTRAINT_PREFIX}{index}"
+
+
+def remove_tracked_constraints(armature, donor_name=None):
+    """Remove the constraints the addon created on an armature, only those of donor_name when given
+
+    Returns the number of removed constraints.
+    """
+    registry = armature.get(CONSTRAINT_REGISTRY)
+    if registry is None:
+        # Untracked armature, e.g. an object copy, fall back to the name prefix
+        registry = {
+            bone.name: {c.name: getattr(c.target, "name", "") for c in bone.constraints if c.name.startswith(CONSTRAINT_PREFIX)}
+            for bone in armature.pose.bones
+        }
+    else:
+        registry = registry.to_dict()
+
+    num_removed = 0
+    pose_bones = armature.pose.bones
+    for bone_name, tracked in registry.items():
+        bone = pose_bones.get(bone_name)
+        for constraint_name, tracked_donor in list(tracked.items()):
+            if donor_name is not None and tracked_donor != donor_name:
+                continue
+            del tracked[constraint_name]
+            constraint = bone.constraints.get(constraint_name) if bone else None
+            if constraint is not None:
+                bone.constraints.remove(constraint)
+                num_removed += 1
+
+    registry = {bone_name: tracked for bone_name, tracked in registry.items() if tracked}
+    if registry:
+        armature[CONSTRAINT_REGISTRY] = registry
+    elif CONSTRAINT_REGISTRY in armature:
+        del armature[CONSTRAINT_REGISTRY]
+    return num_removed
+
 
 class RemoveConstraintsOperator(bpy.types.Operator):
-    """Remove all constraints from selected skeletons"""
+    """Remove the constraints created by TechAnim Friend from selected skeletons"""
     bl_idname = "object.remove_constraints"
     bl_label = "Remove Constraints"
     bl_options = {'REGISTER', 'UNDO'}
 
+    only_tracked: BoolProperty(
+        name="Only Created Constraints",
+        description="Remove only the constraints created by TechAnim Friend, otherwise remove all bone constraints",
+        default=True,
+    )
+
+    @instrumented
     def execute(self, context):
         selected_objects = context.selected_objects
 
@@ -25,17 +1552,25 @@ class RemoveConstraintsOperator(bpy.types.Operator):
             self.report({'WARNING'}, "No armatures selected.")
             return {'CANCELLED'}
 
+        num_removed = 0
         for obj in selected_objects:
             if obj.type == 'ARMATURE':
+                if self.only_tracked:
+                    num_removed += remove_tracked_constraints(obj)
+                    continue
+
                 for bone in obj.pose.bones:
                     # Removing all constraints for each bone
                     while bone.constraints:
                         bone.constraints.remove(bone.constraints[0])
+                        num_removed += 1
+                if CONSTRAINT_REGISTRY in obj:
+                    del obj[CONSTRAINT_REGISTRY]
             else:
                 self.report({'WARNING'}, "Selected object is not an armature.")
                 return {'CANCELLED'}
 
-        self.report({'INFO'}, "Constraints removed successfully.")
+        self.report({'INFO'}, f"Removed {num_removed} constraints successfully.")
         return {'FINISHED'}
 
 
@@ -63,6 +1598,7 @@ class CreateConstraintsOperator(bpy.types.Operator):
         default='LOCAL'
     )
 
+    @instrumented
     def execute(self, context):
         selected_objects = context.selected_objects
 
@@ -72,21 +1608,36 @@ class CreateConstraintsOperator(bpy.types.Operator):
 
         donor_armature = selected_objects[-1]
         recipients = selected_objects[:-1]
+        remap = scene_bone_remap(context)
 
         for recipient in recipients:
             if donor_armature.type == 'ARMATURE' and recipient.type == 'ARMATURE':
-                for donor_bone in donor_armature.pose.bones:
-                    if donor_bone.name in recipient.pose.bones:
-                        recipient_bone = recipient.pose.bones[donor_bone.name]
-
-                        # Checking for existing constraints to avoid duplication
-                        existing_constraints = [c for c in recipient_bone.constraints if c.target == donor_armature and c.subtarget == donor_bone.name]
-                        if not existing_constraints:
-                            constraint = recipient_bone.constraints.new('COPY_TRANSFORMS')
-                            constraint.target = donor_armature
-                            constraint.subtarget = donor_bone.name
-                            constraint.target_space = self.target_space
-                            constraint.owner_space = self.owner_space
+                registry = constraint_registry(recipient)
+                constraint_name = tracked_constraint_name(registry, donor_armature.name)
+
+                bone_map = get_bone_map(donor_armature, recipient, remap)
+                with profile_phase("write constraints"):
+                    for donor_name, recipient_name in bone_map:
+                        recipient_bone = recipient.pose.bones[recipient_name]
+                        tracked = registry.setdefault(recipient_name, {})
+
+                        # Lookup through the registry to avoid duplication instead of scanning the bone's constraints
+                        if any(
+                            donor == donor_armature.name and recipient_bone.constraints.get(name) is not None
+                            for name, donor in tracked.items()
+                        ):
+                            continue
+                        constraint = recipient_bone.constraints.new('COPY_TRANSFORMS')
+                        constraint.name = constraint_name
+                        constraint.target = donor_armature
+                        constraint.subtarget = donor_name
+                        constraint.target_space = self.target_space
+                        constraint.owner_space = self.owner_space
+                        # Blender renames on a clash with an untracked constraint, track the final name
+                        tracked[constraint.name] = donor_armature.name
+                profile_count("bones", len(bone_map))
+
+                recipient[CONSTRAINT_REGISTRY] = registry
             else:
                 self.report({'WARNING'}, "Both objects must be armatures.")
                 return {'CANCELLED'}
@@ -95,12 +1646,168 @@ class CreateConstraintsOperator(bpy.types.Operator):
         return {'FINISHED'}
 
 
+# Live retarget links are stored on the scene as a {recipient name: {"donor": name,
+# "space": 'LOCAL' | 'WORLD'}} custom property. While Scene.techanim_live_retarget
+# is on, a frame change handler copies the evaluated donor pose to the recipients.
+LIVE_LINKS = "techanim_live_links"
+_live_link_cache = {}
+
+
+def live_links(scene):
+    """Live retarget links of a scene as a plain dict"""
+    links = scene.get(LIVE_LINKS)
+    return links.to_dict() if links is not None else {}
+
+
+def apply_live_links(scene, depsgraph):
+    """Copy the evaluated pose of every linked donor to its recipients
+
+    Every donor pose is read once, the recipients get one bulk matrix_basis
+    write each. Local space links copy the donor's local pose derived from
+    its evaluated pose, so the donor's constraints and IK carry over.
+    Returns the number of recipients updated.
+    """
+    objects = scene.objects
+    remap = getattr(scene, "techanim_bone_remap", "")
+    by_donor = {}
+    for recipient_name, link in live_links(scene).items():
+        by_donor.setdefault(link["donor"], []).append((recipient_name, link.get("space", 'LOCAL')))
+
+    num_updated = 0
+    for donor_name, recipients in by_donor.items():
+        donor = objects.get(donor_name)
+        if donor is None or donor.type != 'ARMATURE':
+            continue
+        evaluated = donor.evaluated_get(depsgraph)
+        donor_poses = read_matrix_array(evaluated.pose.bones, 'matrix')
+        donor_local = None
+
+        for recipient_name, space in recipients:
+            recipient = objects.get(recipient_name)
+            if recipient is None or recipient.type != 'ARMATURE' or recipient == donor:
+                continue
+
+            # Bone indices of the link, rebuilt when the cached bone map changes
+            bone_map = get_bone_map(donor, recipient, remap)
+            cached = _live_link_cache.get((donor_name, recipient_name))
+            if cached is None or cached[0] is not bone_map:
+                donor_index = {pose_bone.name: i for i, pose_bone in enumerate(donor.pose.bones)}
+                pose_index = {pose_bone.name: i for i, pose_bone in enumerate(recipient.pose.bones)}
+                cached = (
+                    bone_map,
+                    np.array([donor_index[donor_bone] for donor_bone, _ in bone_map], dtype=np.int64),
+                    np.array([pose_index[recipient_bone] for _, recipient_bone in bone_map], dtype=np.int64),
+                )
+                _live_link_cache[(donor_name, recipient_name)] = cached
+            _, src, dst = cached
+            if not len(src):
+                continue
+
+            pose_bones = recipient.pose.bones
+            basis = read_matrix_array(pose_bones, 'matrix_basis')
+            if space == 'LOCAL':
+                if donor_local is None:
+                    donor_local = pose_to_basis(evaluated, [pose_bone.name for pose_bone in evaluated.pose.bones], donor_poses)
+                basis[dst] = donor_local[src]
+            else:
+                to_recipient = np.linalg.inv(np.array(recipient.matrix_world, dtype=np.float32)) @ np.array(evaluated.matrix_world, dtype=np.float32)
+                names = [recipient_bone for _, recipient_bone in bone_map]
+                basis[dst] = pose_to_basis(recipient, names, to_recipient @ donor_poses[src])
+
+            # foreach_set takes matrices column by column
+            pose_bones.foreach_set('matrix_basis', basis.transpose(0, 2, 1).ravel())
+            recipient.update_tag(refresh={'DATA'})
+            num_updated += 1
+    return num_updated
+
+
+@bpy.app.handlers.persistent
+def live_retarget_handler(scene, depsgraph=None):
+    """frame_change_post handler running the live retarget links of the scene"""
+    if not getattr(scene, "techanim_live_retarget", False) or not scene.get(LIVE_LINKS):
+        return
+    apply_live_links(scene, depsgraph or bpy.context.evaluated_depsgraph_get())
+
+
+def update_live_retarget(scene, context):
+    """Follow the donors right away when the live retarget is switched on"""
+    if scene.techanim_live_retarget:
+        apply_live_links(scene, context.evaluated_depsgraph_get())
+
+
+class LinkLiveRetargetOperator(bpy.types.Operator):
+    """Link the selected recipient armatures to the donor, they follow its pose on every frame change while Live Retarget is on, without constraints"""
+    bl_idname = "object.link_live_retarget"
+    bl_label = "Link Live Retarget"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    space: bpy.props.EnumProperty(
+        items=[
+            ('LOCAL', "Local Space", "Copy the local bone transforms like Local Space constraints"),
+            ('WORLD', "World Space", "Match the world space bone transforms like World Space constraints")
+        ],
+        name="Space",
+        default='LOCAL'
+    )
+
+    @instrumented
+    def execute(self, context):
+        selected_objects = context.selected_objects
+
+        if len(selected_objects) < 2:
+            self.report({'WARNING'}, "Select at least two armatures.")
+            return {'CANCELLED'}
+
+        donor_armature = selected_objects[-1]  # last selected
+        recipients = selected_objects[:-1]  # all other selected objects
+
+        if donor_armature.type != 'ARMATURE' or any(recipient.type != 'ARMATURE' for recipient in recipients):
+            self.report({'WARNING'}, "Both objects must be armatures.")
+            return {'CANCELLED'}
+
+        scene = context.scene
+        links = live_links(scene)
+        for recipient in recipients:
+            links[recipient.name] = {"donor": donor_armature.name, "space": self.space}
+        scene[LIVE_LINKS] = links
+
+        if scene.techanim_live_retarget:
+            apply_live_links(scene, context.evaluated_depsgraph_get())
+
+        self.report({'INFO'}, f"Linked {len(recipients)} armatures to {donor_armature.name}.")
+        return {'FINISHED'}
+
+
+class UnlinkLiveRetargetOperator(bpy.types.Operator):
+    """Remove the live retarget links of the selected armatures, as recipients or as donors"""
+    bl_idname = "object.unlink_live_retarget"
+    bl_label = "Unlink Live Retarget"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    @instrumented
+    def execute(self, context):
+        scene = context.scene
+        names = {obj.name for obj in context.selected_objects}
+        links = live_links(scene)
+        kept = {recipient: link for recipient, link in links.items() if recipient not in names and link["donor"] not in names}
+
+        if kept:
+            scene[LIVE_LINKS] = kept
+        elif LIVE_LINKS in scene:
+            del scene[LIVE_LINKS]
+        _live_link_cache.clear()
+
+        self.report({'INFO'}, f"Removed {len(links) - len(kept)} live retarget links.")
+        return {'FINISHED'}
+
+
 class CopyBonesTransformsEditModeOperator(bpy.types.Operator):
     """Copy bone transforms in Edit Mode"""
     bl_idname = "object.copy_bones_transforms_edit_mode"
     bl_label = "Copy Bones Transforms (Edit Mode)"
     bl_options = {'REGISTER', 'UNDO'}
 
+    @instrumented
     def execute(self, context):
         selected_objects = context.selected_objects
 
@@ -110,37 +1817,255 @@ class CopyBonesTransformsEditModeOperator(bpy.types.Operator):
 
         donor_armature = selected_objects[-1]  # последний выбранный
         recipients = selected_objects[:-1]  # все остальные
+        remap = scene_bone_remap(context)
 
-        # Переключаемся в Edit Mode для всех объектов
-        bpy.ops.object.mode_set(mode='OBJECT')
-        bpy.ops.object.select_all(action='DESELECT')
-        donor_armature.select_set(True)
-        bpy.context.view_layer.objects.active = donor_armature
-        bpy.ops.object.mode_set(mode='EDIT')
+        if donor_armature.type != 'ARMATURE' or any(recipient.type != 'ARMATURE' for recipient in recipients):
+            self.report({'WARNING'}, "Both objects must be armatures.")
+            return {'CANCELLED'}
 
+        # Один multi-object Edit Mode для донора и всех реципиентов
+        set_mode('OBJECT')
+        bpy.ops.object.select_all(action='DESELECT')
+        for obj in [donor_armature] + recipients:
+            obj.select_set(True)
+        context.view_layer.objects.active = donor_armature
+        set_mode('EDIT')
+
+        # Снимаем head/tail/roll донора в массивы один раз
+        donor_bones = donor_armature.data.edit_bones
+        donor_index = {bone.name: i for i, bone in enumerate(donor_bones)}
+        heads = read_vector_array(donor_bones, 'head')
+        tails = read_vector_array(donor_bones, 'tail')
+        rolls = read_vector_array(donor_bones, 'roll', 1)
+
+        # Копируем трансформации костей в Edit Mode для всех реципиентов за один проход
         for recipient in recipients:
-            if donor_armature.type == 'ARMATURE' and recipient.type == 'ARMATURE':
-                bpy.ops.object.mode_set(mode='OBJECT')
-                recipient.select_set(True)
-                bpy.context.view_layer.objects.active = recipient
-                bpy.ops.object.mode_set(mode='EDIT')
-
-                # Копируем трансформации костей в Edit Mode
-                for donor_bone in donor_armature.data.edit_bones:
-                    if donor_bone.name in recipient.data.edit_bones:
-                        recipient_bone = recipient.data.edit_bones[donor_bone.name]
-                        recipient_bone.head = donor_bone.head
-                        recipient_bone.tail = donor_bone.tail
-                        recipient_bone.roll = donor_bone.roll
+            edit_bones = recipient.data.edit_bones
+            bone_index = {bone.name: i for i, bone in enumerate(edit_bones)}
+            pairs = [
+                (donor_index[donor_name], bone_index[recipient_name])
+                for donor_name, recipient_name in get_bone_map(donor_armature, recipient, remap)
+                if donor_name in donor_index and recipient_name in bone_index
+            ]
+            if not pairs:
+                continue
+            src, dst = np.array(pairs, dtype=np.int64).T
+
+            recipient_heads = read_vector_array(edit_bones, 'head')
+            recipient_tails = read_vector_array(edit_bones, 'tail')
+            recipient_rolls = read_vector_array(edit_bones, 'roll', 1)
+            recipient_heads[dst] = heads[src]
+            recipient_tails[dst] = tails[src]
+            recipient_rolls[dst] = rolls[src]
+            # foreach_set skips the update keeping connected bones joined, so it is redone here
+            snap_connected_bones(edit_bones, bone_index, recipient_heads, recipient_tails, dst)
+            with profile_phase("write transforms"):
+                edit_bones.foreach_set('head', recipient_heads.ravel())
+                edit_bones.foreach_set('tail', recipient_tails.ravel())
+                edit_bones.foreach_set('roll', recipient_rolls.ravel())
+            profile_count("bones", len(dst))
 
         # Возвращаемся в исходный режим
-        bpy.ops.object.mode_set(mode='OBJECT')
+        set_mode('OBJECT')
 
         self.report({'INFO'}, "Bone transforms copied successfully in Edit Mode.")
         return {'FINISHED'}
 
+# Weight operators on meshes with at least this many vertices run modal when invoked from the UI
+MODAL_MIN_VERTICES = 50000
+INTERACTIVE_MODES = {'EDIT_MESH': 'EDIT', 'PAINT_WEIGHT': 'WEIGHT_PAINT'}
+# Events a running modal weight operator passes on, so the viewport can still be navigated
+NAVIGATION_EVENTS = {
+    'MOUSEMOVE', 'INBETWEEN_MOUSEMOVE', 'MIDDLEMOUSE', 'WHEELUPMOUSE', 'WHEELDOWNMOUSE',
+    'WHEELINMOUSE', 'WHEELOUTMOUSE', 'TRACKPADPAN', 'TRACKPADZOOM', 'NDOF_MOTION',
+}
+
+
+def selected_meshes(context):
+    """The active mesh object followed by the other selected mesh objects"""
+    active = context.active_object
+    return [active] + [obj for obj in context.selected_objects if obj.type == 'MESH' and obj != active]
+
+
+def run_compute(compute, progress, stop):
+    """Run the compute function of a weight job on a worker thread
+
+    A generator function yielding fractions keeps its progress in progress[0]
+    and is closed early once stop is set.
+    """
+    if not inspect.isgeneratorfunction(compute):
+        return compute()
+    steps = compute()
+    while not stop.is_set():
+        try:
+            progress[0] = next(steps) or 0.0
+        except StopIteration as result:
+            return result.value
+    steps.close()
+    return None
+
+
+class ChunkedWeightJob:
+    """Mixin for weight operators that run over all selected meshes in time-budgeted chunks
+
+    The operator implements prepare(context), returning the meshes to process
+    or None to cancel, load_object(obj), a generator yielding the read progress
+    that returns the object's WeightMatrix and a pure NumPy function computing
+    its new weights, and finish(context, results) taking (object, result of the
+    compute function) pairs. A compute function may be a generator yielding
+    its progress, it then runs in chunks too. Weights are read and written on the main thread,
+    the compute functions run on a thread pool while the next mesh is read.
+    execute() runs the job in one go. invoke() on large meshes runs it from a
+    timer with progress in the header, ESC cancels and rolls the weights back.
+    """
+
+    use_threads: BoolProperty(
+        name="Parallel Compute",
+        description="Compute the weights of the meshes on a thread pool while the next mesh is read",
+        default=True,
+    )
+
+    time_budget: FloatProperty(
+        name="Time Budget",
+        description="Seconds of work per timer step when running interactively",
+        default=0.05,
+        min=0.005,
+        max=1.0,
+    )
+
+    @instrumented
+    def execute(self, context):
+        self.original_mode = context.mode
+        self.loaded = []
+        objects = self.prepare(context)
+        if objects is None:
+            return {'CANCELLED'}
+        self.finish(context, run_to_end(self.weight_job(objects)))
+        return {'FINISHED'}
+
+    def invoke(self, context, event):
+        if sum(len(obj.data.vertices) for obj in selected_meshes(context)) < MODAL_MIN_VERTICES:
+            return self.execute(context)
+
+        # The profile record spans the whole modal run, each step is recorded while it runs
+        self._profile = start_profile(self.bl_idname, context.scene)
+        with profile_step(self._profile):
+            self.original_mode = context.mode
+            self.loaded = []
+            objects = self.prepare(context)
+        if objects is None:
+            end_profile(self._profile, {'CANCELLED'})
+            return {'CANCELLED'}
+
+        self._job = self.weight_job(objects)
+        window_manager = context.window_manager
+        self._timer = window_manager.event_timer_add(0.01, window=context.window)
+        window_manager.progress_begin(0, 100)
+        window_manager.modal_handler_add(self)
+        return {'RUNNING_MODAL'}
+
+    def modal(self, context, event):
+        if event.type == 'ESC':
+            self.cancel(context)
+            self.report({'WARNING'}, f"{self.bl_label} cancelled, weights restored")
+            return {'CANCELLED'}
+        if event.type != 'TIMER':
+            # Viewport navigation passes through, other input is swallowed while the weights are half written
+            return {'PASS_THROUGH'} if event.type in NAVIGATION_EVENTS else {'RUNNING_MODAL'}
+
+        finished = False
+        error = None
+        with profile_step(self._profile):
+            deadline = time.perf_counter() + self.time_budget
+            try:
+                while time.perf_counter() < deadline:
+                    stage, progress = next(self._job)
+            except StopIteration as stop:
+                self._end_modal(context)
+                self.finish(context, stop.value)
+                finished = True
+            except Exception as exc:
+                error = exc
+        if finished:
+            end_profile(self._profile, {'FINISHED'})
+            return {'FINISHED'}
+        if error is not None:
+            self.cancel(context)
+            self.report({'ERROR'}, f"{self.bl_label} failed: {error}")
+            return {'CANCELLED'}
+
+        context.window_manager.progress_update(int(progress * 100))
+        if context.area:
+            context.area.header_text_set(f"{self.bl_label}: {stage} {progress:.0%}, Esc to cancel")
+        return {'RUNNING_MODAL'}
+
+    def cancel(self, context):
+        with profile_step(self._profile):
+            self._end_modal(context)
+            for obj, weight_matrix in self.loaded:
+                weight_matrix.rollback(obj)
+            self.restore_mode()
+        end_profile(self._profile, {'CANCELLED'})
+
+    def _end_modal(self, context):
+        self._job.close()
+        context.window_manager.event_timer_remove(self._timer)
+        context.window_manager.progress_end()
+        if context.area:
+            context.area.header_text_set(None)
+
+    def weight_job(self, objects):
+        """Read, compute and write the weights of all objects, yields (stage, progress)
+
+        Returns the (object, compute result) pairs.
+        """
+        num_objects = len(objects)
+        # Threads, not processes: NumPy releases the GIL and worker processes could not reach bpy data
+        pool = futures.ThreadPoolExecutor(min(num_objects, os.cpu_count() or 1)) if self.use_threads else None
+        stop = threading.Event()
+        try:
+            computations = []
+            for i, obj in enumerate(objects):
+                start = i / num_objects / 2
+                weight_matrix, compute = yield from job_stage(
+                    f"{obj.name}: reading weights", self.load_object(obj), start, start + 0.5 / num_objects)
+                self.loaded.append((obj, weight_matrix))
+                progress = [0.0]
+                computations.append((pool.submit(run_compute, compute, progress, stop) if pool else compute, progress))
+
+            results = []
+            for i, ((obj, weight_matrix), (computation, progress)) in enumerate(zip(self.loaded, computations)):
+                start = 0.5 + i / num_objects / 2
+                middle = start + 0.25 / num_objects
+                yield f"{obj.name}: computing", start
+                with profile_phase("compute"):
+                    if pool:
+                        while not computation.done():
+                            futures.wait([computation], timeout=0.005)
+                            yield f"{obj.name}: computing", start + (middle - start) * progress[0]
+                        result = computation.result()
+                    elif inspect.isgeneratorfunction(computation):
+                        result = yield from job_stage(f"{obj.name}: computing", computation(), start, middle)
+                    else:
+                        result = computation()
+                results.append((obj, result))
+                yield from job_stage(
+                    f"{obj.name}: writing weights", weight_matrix.iter_commit(obj), middle, start + 0.5 / num_objects)
+            return results
+        finally:
+            stop.set()
+            if pool:
+                pool.shutdown(wait=False, cancel_futures=True)
+
+    def restore_mode(self):
+        """Return to the mode the operator was started in"""
+        mode = INTERACTIVE_MODES.get(self.original_mode)
+        if mode:
+            set_mode(mode)
+
+
 # Operator to clean up bone influences on vertices (max influences check)
-class CleanUpBoneInfluencesOperator(bpy.types.Operator):
+class CleanUpBoneInfluencesOperator(bpy.types.Operator, ChunkedWeightJob):
     """Clean up vertices with more than the specified number of bone influences, removing the least important ones and normalizing the rest"""
     bl_idname = "object.clean_up_bone_influences"
     bl_label = "Clean Up Bone Influences"
@@ -157,54 +2082,119 @@ class CleanUpBoneInfluencesOperator(bpy.types.Operator):
     def poll(cls, context):
         return context.active_object is not None and context.active_object.type == 'MESH'
 
-    def execute(self, context):
-        obj = context.active_object
-
+    def prepare(self, context):
         # Ensure we're in Object Mode
-        current_mode = obj.mode
-        if current_mode != 'OBJECT':
-            bpy.ops.object.mode_set(mode='OBJECT')
+        set_mode('OBJECT')
 
-        mesh = obj.data
-        vgroups = obj.vertex_groups
-
-        if not vgroups:
+        objects = [obj for obj in selected_meshes(context) if obj.vertex_groups]
+        if not objects:
             self.report({'WARNING'}, "Object has no vertex groups")
-            return {'CANCELLED'}
+            self.restore_mode()
+            return None
+        return objects
+
+    def load_object(self, obj):
+        # Read all weights at once, limit and renormalize them as whole arrays
+        weight_matrix = yield from WeightMatrix.iter_from_object(obj)
+        max_influences = self.max_influences
+
+        def compute():
+            num_vertices_adjusted = int((weight_matrix.influence_counts() > max_influences).sum())
+            num_weights = len(weight_matrix.weights)
+            weight_matrix.limit(max_influences).normalize()
+            return num_weights - len(weight_matrix.weights), num_vertices_adjusted
+
+        return weight_matrix, compute
+
+    def finish(self, context, results):
+        self.restore_mode()
+        num_weights_removed = sum(removed for obj, (removed, adjusted) in results)
+        num_vertices_adjusted = sum(adjusted for obj, (removed, adjusted) in results)
+        self.report({'INFO'}, f"Removed {num_weights_removed} weights; adjusted {num_vertices_adjusted} vertices on {len(results)} meshes to have max {self.max_influences} influences")
+
+
+# Operator to quantize weights for engine export
+class QuantizeWeightsOperator(bpy.types.Operator, ChunkedWeightJob):
+    """Keep the strongest influences of every vertex and quantize them to a bit depth, summing exactly to the largest value"""
+    bl_idname = "object.quantize_weights"
+    bl_label = "Quantize Weights"
+    bl_options = {'REGISTER', 'UNDO'}
 
-        num_weights_removed = 0
-        num_vertices_adjusted = 0
-
-        for vert in mesh.vertices:
-            # Get all groups and weights for this vertex
-            weights = []
-            for g in vert.groups:
-                group = vgroups[g.group]
-                weight = g.weight
-                weights.append((group, weight))
-
-            # Sort weights in descending order
-            weights.sort(key=lambda x: x[1], reverse=True)
-
-            if len(weights) > self.max_influences:
-                # Remove the smallest weights to limit max influences
-                for group, weight in weights[self.max_influences:]:
-                    group.remove([vert.index])
-                    num_weights_removed += 1
-                num_vertices_adjusted += 1
-
-            # Normalize remaining weights
-            total_weight = sum(w[1] for w in weights[:self.max_influences])
-            if total_weight > 0:
-                for group, weight in weights[:self.max_influences]:
-                    group.add([vert.index], weight / total_weight, 'REPLACE')
-
-        self.report({'INFO'}, f"Removed {num_weights_removed} weights; adjusted {num_vertices_adjusted} vertices to have max {self.max_influences} influences")
-        return {'FINISHED'}
+    max_influences: IntProperty(
+        name="Max Influences",
+        description="Number of bone influences per vertex the engine reads",
+        default=4,
+        min=1,
+        max=8,
+    )
+
+    bit_depth: bpy.props.EnumProperty(
+        items=[
+            ('8', "8 Bit", "Weights are multiples of 1/255"),
+            ('16', "16 Bit", "Weights are multiples of 1/65535")
+        ],
+        name="Bit Depth",
+        default='8'
+    )
+
+    filepath: StringProperty(
+        name="Packed Buffer",
+        description="Also write the packed group indices and quantized weights to this binary file, per mesh when several are selected",
+        default="",
+        subtype='FILE_PATH',
+    )
+
+    @classmethod
+    def poll(cls, context):
+        return context.active_object is not None and context.active_object.type == 'MESH'
+
+    def prepare(self, context):
+        # Ensure we're in Object Mode
+        set_mode('OBJECT')
+
+        objects = [obj for obj in selected_meshes(context) if obj.vertex_groups]
+        if not objects:
+            self.report({'WARNING'}, "Object has no vertex groups")
+            self.restore_mode()
+            return None
+        return objects
+
+    def load_object(self, obj):
+        weight_matrix = yield from WeightMatrix.iter_from_object(obj)
+        group_names = [vgroup.name for vgroup in obj.vertex_groups]
+        max_influences = self.max_influences
+        levels = 2 ** int(self.bit_depth) - 1
+        pack = bool(self.filepath)
+
+        def compute():
+            num_vertices_limited = int((weight_matrix.influence_counts() > max_influences).sum())
+            weight_matrix.limit(max_influences).quantize(levels)
+            num_unweighted = int((weight_matrix.influence_counts() == 0).sum())
+            packed = None
+            if pack:
+                packed = pack_influences(weight_matrix.indptr, weight_matrix.groups, weight_matrix.weights, levels, max_influences)
+            return num_vertices_limited, num_unweighted, packed, group_names
+
+        return weight_matrix, compute
+
+    def finish(self, context, results):
+        self.restore_mode()
+
+        if self.filepath:
+            path = bpy.path.abspath(self.filepath)
+            root, ext = os.path.splitext(path)
+            for obj, (_, _, (indices, weights), group_names) in results:
+                if len(results) > 1:
+                    path = f"{root}_{bpy.path.clean_name(obj.name)}{ext}"
+                save_packed_weights(path, indices, weights, group_names)
+
+        num_vertices_limited = sum(limited for obj, (limited, unweighted, packed, names) in results)
+        num_unweighted = sum(unweighted for obj, (limited, unweighted, packed, names) in results)
+        self.report({'INFO'}, f"Quantized weights of {len(results)} meshes to {self.bit_depth} bit, {num_vertices_limited} vertices limited to {self.max_influences} influences, {num_unweighted} vertices without weights")
 
 
 # Operator to clean up weights below a threshold and normalize
-class CleanUpWeightsThresholdOperator(bpy.types.Operator):
+class CleanUpWeightsThresholdOperator(bpy.types.Operator, ChunkedWeightJob):
     """Clean up weights below a threshold and normalize the remaining weights"""
     bl_idname = "object.clean_up_weights_threshold"
     bl_label = "Clean Up Weights by Threshold"
@@ -218,52 +2208,198 @@ class CleanUpWeightsThresholdOperator(bpy.types.Operator):
         max=1.0,
     )
 
+    dry_run: BoolProperty(
+        name="Dry Run",
+        description="Only report how many weights would be removed, without changing the mesh",
+        default=False,
+    )
+
+    histogram_bins: IntProperty(
+        name="Histogram Bins",
+        description="Number of bins of the removed weights histogram reported by a dry run",
+        default=5,
+        min=1,
+        max=20,
+    )
+
     @classmethod
     def poll(cls, context):
         return context.active_object is not None and context.active_object.type == 'MESH'
 
-    def execute(self, context):
-        obj = context.active_object
-
+    def prepare(self, context):
         # Ensure we're in Object Mode
-        current_mode = obj.mode
-        if current_mode != 'OBJECT':
-            bpy.ops.object.mode_set(mode='OBJECT')
+        set_mode('OBJECT')
 
-        mesh = obj.data
-        vgroups = obj.vertex_groups
-
-        if not vgroups:
+        objects = [obj for obj in selected_meshes(context) if obj.vertex_groups]
+        if not objects:
             self.report({'WARNING'}, "Object has no vertex groups")
-            return {'CANCELLED'}
+            self.restore_mode()
+            return None
+        return objects
+
+    def load_object(self, obj):
+        # Snapshot all weights, then filter and renormalize them as whole arrays
+        weight_matrix = yield from WeightMatrix.iter_from_object(obj)
+        threshold = self.threshold
+        dry_run = self.dry_run
+
+        def compute():
+            below = weight_matrix.weights < threshold
+            removed = weight_matrix.weights[below]
+            num_vertices = len(np.unique(weight_matrix.rows[below]))
+            # A dry run leaves the matrix untouched, so its commit writes nothing
+            if not dry_run:
+                weight_matrix.threshold(threshold).normalize()
+            return removed, num_vertices
+
+        return weight_matrix, compute
+
+    def finish(self, context, results):
+        self.restore_mode()
+        removed = np.concatenate([weights for obj, (weights, num_vertices) in results])
+        num_weights_removed = len(removed)
+
+        if self.dry_run:
+            counts, edges = np.histogram(removed, bins=self.histogram_bins, range=(0.0, max(self.threshold, 1e-6)))
+            histogram = ", ".join(f"{low:.3f}-{high:.3f}: {count}" for low, high, count in zip(edges[:-1], edges[1:], counts))
+            num_vertices = sum(num_vertices for obj, (weights, num_vertices) in results)
+            self.report({'INFO'}, f"Dry run: would remove {num_weights_removed} weights on {num_vertices} vertices below {self.threshold:.3f} ({histogram})")
+            return
+
+        self.report({'INFO'}, f"Removed {num_weights_removed} weights below {self.threshold:.3f} on {len(results)} meshes")
+
+
+def modifier_vertex_groups(obj):
+    """Names of the vertex groups the object's modifiers refer to"""
+    names = set()
+    for modifier in obj.modifiers:
+        for prop in modifier.bl_rna.properties:
+            if prop.type == 'STRING' and "vertex_group" in prop.identifier:
+                names.add(getattr(modifier, prop.identifier))
+    return names
+
+
+# Operator to remove unused vertex groups and merge groups
+class CompactVertexGroupsOperator(bpy.types.Operator, ChunkedWeightJob):
+    """Remove empty, near-zero and orphaned vertex groups and merge groups, on all selected meshes"""
+    bl_idname = "object.compact_vertex_groups"
+    bl_label = "Compact Vertex Groups"
+    bl_options = {'REGISTER', 'UNDO'}
 
-        num_weights_removed = 0
-
-        for vert in mesh.vertices:
-            # Get all groups and weights for this vertex
-            weights = []
-            for g in vert.groups:
-                group = vgroups[g.group]
-                weight = g.weight
-                if weight < self.threshold:
-                    # Remove weight below threshold
-                    group.remove([vert.index])
-                    num_weights_removed += 1
-                else:
-                    weights.append((group, weight))
+    remove_unused: BoolProperty(
+        name="Remove Unused",
+        description="Remove groups without a weight above the threshold, including empty groups",
+        default=True,
+    )
 
-            # Normalize remaining weights
-            total_weight = sum(w[1] for w in weights)
-            if total_weight > 0:
-                for group, weight in weights:
-                    group.add([vert.index], weight / total_weight, 'REPLACE')
+    threshold: FloatProperty(
+        name="Threshold",
+        description="Groups whose largest weight is not above this value are unused",
+        default=0.001,
+        min=0.0,
+        max=1.0,
+        precision=4,
+    )
 
-        self.report({'INFO'}, f"Removed {num_weights_removed} weights below {self.threshold:.3f}")
-        return {'FINISHED'}
+    remove_orphaned: BoolProperty(
+        name="Remove Orphaned",
+        description="Remove groups without a bone of the mesh's armature",
+        default=True,
+    )
+
+    remove_non_deform: BoolProperty(
+        name="Remove Non-Deform",
+        description="Remove groups of bones that do not deform",
+        default=False,
+    )
+
+    merge: StringProperty(
+        name="Merge",
+        description="Groups merged into others as 'source=target, source=target', weights are summed and the source groups removed",
+        default="",
+    )
+
+    @classmethod
+    def poll(cls, context):
+        return context.active_object is not None and context.active_object.type == 'MESH'
+
+    def prepare(self, context):
+        # Ensure we're in Object Mode
+        set_mode('OBJECT')
+
+        objects = [obj for obj in selected_meshes(context) if obj.vertex_groups]
+        if not objects:
+            self.report({'WARNING'}, "Object has no vertex groups")
+            self.restore_mode()
+            return None
+        return objects
+
+    def load_object(self, obj):
+        vgroups = obj.vertex_groups
+
+        # Merge targets are created where missing, before the groups are read
+        merge = {source: target for source, target in parse_bone_remap(self.merge).items() if vgroups.get(source) and source != target}
+        resolved = {}
+        for source, target in merge.items():
+            # Chains like a=b, b=c end in their last group, rules in a cycle are skipped
+            seen = {source}
+            while target in merge and target not in seen:
+                seen.add(target)
+                target = merge[target]
+            if target not in seen:
+                resolved[source] = target
+        merge = resolved
+        for target in merge.values():
+            if vgroups.get(target) is None:
+                vgroups.new(name=target)
+        group_names = [vgroup.name for vgroup in vgroups]
+        group_map = np.arange(len(group_names))
+        for source, target in merge.items():
+            group_map[vgroups[source].index] = vgroups[target].index
+        merged = group_map != np.arange(len(group_names))
+
+        # Groups a bone of the armature deforms with, modifier groups are kept
+        orphaned = np.zeros(len(group_names), dtype=bool)
+        armature = obj.find_armature()
+        if armature is not None and (self.remove_orphaned or self.remove_non_deform):
+            bones = armature.data.bones
+            for i, name in enumerate(group_names):
+                bone = bones.get(name)
+                orphaned[i] = (bone is None and self.remove_orphaned) or (bone is not None and not bone.use_deform and self.remove_non_deform)
+        protected = np.isin(group_names, list(modifier_vertex_groups(obj)))
+
+        weight_matrix = yield from WeightMatrix.iter_from_object(obj)
+        remove_unused = self.remove_unused
+        threshold = self.threshold
+
+        def compute():
+            if merged.any():
+                weight_matrix.merge_groups(group_map)
+            # One scan of all weights finds the groups without a weight above the threshold
+            used = np.bincount(weight_matrix.groups[weight_matrix.weights > threshold], minlength=len(group_names)) > 0
+            unused = ~used & remove_unused
+            removed = merged | ((unused | orphaned) & ~protected)
+            return [group_names[i] for i in np.flatnonzero(removed)], int(merged.sum())
+
+        return weight_matrix, compute
+
+    def finish(self, context, results):
+        # Groups are removed after the merged weights are written, from the last index down
+        num_removed = 0
+        for obj, (names, num_merged) in results:
+            vgroups = obj.vertex_groups
+            for name in reversed(names):
+                vgroups.remove(vgroups[name])
+            num_removed += len(names)
+            profile_count("groups removed", len(names))
+
+        self.restore_mode()
+        num_merged = sum(num_merged for obj, (names, num_merged) in results)
+        self.report({'INFO'}, f"Removed {num_removed} vertex groups ({num_merged} merged) on {len(results)} meshes")
 
 
 # Operator to smooth selected vertices weights
-class SmoothSelectedVerticesWeightsOperator(bpy.types.Operator):
+class SmoothSelectedVerticesWeightsOperator(bpy.types.Operator, ChunkedWeightJob):
     """Smooth weights of selected vertices over specified iterations"""
     bl_idname = "object.smooth_selected_vertices_weights"
     bl_label = "Smooth Selected Vertices Weights"
@@ -293,106 +2429,90 @@ class SmoothSelectedVerticesWeightsOperator(bpy.types.Operator):
             context.mode == 'EDIT_MESH'
         )
 
-    def execute(self, context):
-        obj = context.active_object
-
+    def prepare(self, context):
         # Ensure we are in Edit Mode
         if context.mode != 'EDIT_MESH':
             self.report({'WARNING'}, "Must be in Edit Mode")
-            return {'CANCELLED'}
+            return None
 
-        mesh = obj.data
+        # Switch to Object Mode to access vertex groups, this also flushes the selection
+        set_mode('OBJECT')
 
-        # Create BMesh
-        bm = bmesh.from_edit_mesh(mesh)
+        self.selections = {}
+        for obj in selected_meshes(context):
+            selection = np.zeros(len(obj.data.vertices), dtype=bool)
+            obj.data.vertices.foreach_get('select', selection)
+            if selection.any():
+                self.selections[obj.name] = np.flatnonzero(selection)
 
-        # Get indices of selected vertices
-        selected_verts_indices = [v.index for v in bm.verts if v.select]
-
-        if not selected_verts_indices:
+        if not self.selections:
             self.report({'WARNING'}, "No vertices selected")
-            return {'CANCELLED'}
-
-        # Switch to Object Mode to access vertex groups
-        bpy.ops.object.mode_set(mode='OBJECT')
+            set_mode('EDIT')
+            return None
 
         # Get vertex groups
-        vgroups = obj.vertex_groups
+        objects = [obj for obj in selected_meshes(context) if obj.name in self.selections and obj.vertex_groups]
 
-        if not vgroups:
+        if not objects:
             self.report({'WARNING'}, "Object has no vertex groups")
-            bpy.ops.object.mode_set(mode='EDIT')
-            return {'CANCELLED'}
-
-        all_vertices = obj.data.vertices
-
-        # Build a dictionary of neighbors for all vertices
-        vertex_neighbors = {v.index: set() for v in all_vertices}
-        for edge in obj.data.edges:
-            v1, v2 = edge.vertices
-            vertex_neighbors[v1].add(v2)
-            vertex_neighbors[v2].add(v1)
-
-        # Perform smoothing
-        for iteration in range(self.iterations):
-            # For each vertex group
-            for vgroup in vgroups:
-                # Store new weights here
-                new_weights = {}
-
-                # For each selected vertex
-                for idx in selected_verts_indices:
-                    v = all_vertices[idx]
-
-                    # Get current weight
-                    try:
-                        w = vgroup.weight(v.index)
-                    except RuntimeError:
-                        w = 0.0
-
-                    # Get weights of neighboring vertices
-                    neighbor_weights = []
-                    for n_idx in vertex_neighbors[v.index]:
-                        try:
-                            nw = vgroup.weight(n_idx)
-                        except RuntimeError:
-                            nw = 0.0
-                        neighbor_weights.append(nw)
-
-                    # Calculate new weight
-                    if neighbor_weights:
-                        average_weight = sum(neighbor_weights) / len(neighbor_weights)
-                        # Optionally include current vertex weight
-                        new_weight = (w + average_weight) / 2
-                    else:
-                        new_weight = w
-
-                    new_weights[v.index] = new_weight
-
-                # Apply new weights with threshold-based removal
-                for idx, weight in new_weights.items():
-                    if weight < self.threshold:
-                        vgroup.remove([idx])
-                    else:
-                        vgroup.add([idx], weight, 'REPLACE')
-
+            set_mode('EDIT')
+            return None
+        return objects
+
+    def load_object(self, obj):
+        # Neighbor matrix of the selection from the cached mesh adjacency,
+        # the unselected one-ring stays fixed so only these vertices' weights are loaded
+        adjacency = build_selection_adjacency(get_vertex_adjacency(obj.data), self.selections[obj.name])
+        region = adjacency[0]
+        profile_count("region vertices", len(region))
+
+        # Perform smoothing and write back only the groups that changed
+        weight_matrix = yield from WeightMatrix.iter_from_object(obj, region)
+        iterations = self.iterations
+        threshold = self.threshold
+        return weight_matrix, lambda: weight_matrix.smooth(adjacency, iterations, threshold)
+
+    def finish(self, context, results):
         # Switch back to Edit Mode
-        bpy.ops.object.mode_set(mode='EDIT')
+        set_mode('EDIT')
 
-        # Update the mesh
-        bmesh.update_edit_mesh(mesh)
+        # Update the meshes
+        for obj, _ in results:
+            bmesh.update_edit_mesh(obj.data)
 
-        self.report({'INFO'}, f"Weights smoothed over {self.iterations} iterations with weights below {self.threshold:.3f} removed")
-        return {'FINISHED'}
+        message = f"Weights smoothed over {self.iterations} iterations with weights below {self.threshold:.3f} removed"
+        if sparse is None:
+            self.report({'WARNING'}, f"{message}, without SciPy, installing SciPy into Blender's Python makes it faster")
+        else:
+            self.report({'INFO'}, message)
 
 
 # Operator for copying bone transforms (Pose Mode) considering parent bones
 class CopyBonesTransformsPoseModeOperator(bpy.types.Operator):
-    """Copy bone transforms in Pose Mode considering parent transforms"""
+    """Copy the donor's current pose to the mapped bones of the recipients, writing every recipient's pose at once"""
     bl_idname = "object.copy_bones_transforms_pose_mode"
     bl_label = "Copy Bones Transforms (Pose Mode)"
     bl_options = {'REGISTER', 'UNDO'}
 
+    match_mode: bpy.props.EnumProperty(
+        items=[
+            ('MATRIX', "Matrix", "Give the recipient bones the pose of the donor bones"),
+            ('REST_OFFSET', "Rest Offset", "Apply the donor bones' change from their rest pose to the recipient's rest pose, for rigs with different rest poses")
+        ],
+        name="Match",
+        default='MATRIX'
+    )
+
+    space: bpy.props.EnumProperty(
+        items=[
+            ('ARMATURE', "Armature Space", "Copy the bone matrices relative to the armature objects"),
+            ('WORLD', "World Space", "Match the bone matrices in world space, for armature objects placed differently")
+        ],
+        name="Space",
+        default='ARMATURE'
+    )
+
+    @instrumented
     def execute(self, context):
         selected_objects = context.selected_objects
 
@@ -402,28 +2522,181 @@ class CopyBonesTransformsPoseModeOperator(bpy.types.Operator):
 
         donor_armature = selected_objects[-1]  # last selected
         recipients = selected_objects[:-1]  # all other selected objects
+        remap = scene_bone_remap(context)
+
+        if donor_armature.type != 'ARMATURE' or any(recipient.type != 'ARMATURE' for recipient in recipients):
+            self.report({'WARNING'}, "Both objects must be armatures.")
+            return {'CANCELLED'}
+
+        # Donor pose, and its change from the rest pose, in armature space
+        donor_index = {pose_bone.name: i for i, pose_bone in enumerate(donor_armature.pose.bones)}
+        donor_poses = read_matrix_array(donor_armature.pose.bones, 'matrix')
+        if self.match_mode == 'REST_OFFSET':
+            rest_index = {bone.name: i for i, bone in enumerate(donor_armature.data.bones)}
+            donor_rest = read_matrix_array(donor_armature.data.bones, 'matrix_local')
+            donor_poses = donor_poses @ np.linalg.inv(donor_rest[[rest_index[name] for name in donor_index]])
 
         for recipient in recipients:
-            if donor_armature.type == 'ARMATURE' and recipient.type == 'ARMATURE':
-                for donor_bone in donor_armature.pose.bones:
-                    if donor_bone.name in recipient.pose.bones:
-                        recipient_bone = recipient.pose.bones[donor_bone.name]
-
-                        # Copying relative to parent bones
-                        if donor_bone.parent:
-                            parent_matrix_inv = donor_bone.parent.matrix.inverted()
-                            recipient_bone.matrix = parent_matrix_inv @ donor_bone.matrix
-                        else:
-                            recipient_bone.matrix = donor_bone.matrix
-            else:
-                self.report({'WARNING'}, "Both objects must be armatures.")
-                return {'CANCELLED'}
+            bone_map = get_bone_map(donor_armature, recipient, remap)
+            if not bone_map:
+                continue
+            names = [recipient_name for _, recipient_name in bone_map]
+            targets = donor_poses[[donor_index[donor_name] for donor_name, _ in bone_map]]
+            if self.space == 'WORLD':
+                # Donor matrices in the recipient's armature space, a rest offset is a change within it
+                to_recipient = (np.linalg.inv(np.array(recipient.matrix_world, dtype=np.float32)) @
+                                np.array(donor_armature.matrix_world, dtype=np.float32))
+                targets = to_recipient @ targets
+                if self.match_mode == 'REST_OFFSET':
+                    targets = targets @ np.linalg.inv(to_recipient)
+            if self.match_mode == 'REST_OFFSET':
+                bone_index = {bone.name: i for i, bone in enumerate(recipient.data.bones)}
+                recipient_rest = read_matrix_array(recipient.data.bones, 'matrix_local')
+                targets = targets @ recipient_rest[[bone_index[name] for name in names]]
+
+            # All local transforms from one hierarchy pass, written with one bulk assignment
+            pose_bones = recipient.pose.bones
+            pose_index = {pose_bone.name: i for i, pose_bone in enumerate(pose_bones)}
+            basis = read_matrix_array(pose_bones, 'matrix_basis')
+            basis[[pose_index[name] for name in names]] = pose_to_basis(recipient, names, targets)
+            with profile_phase("write transforms"):
+                # foreach_set takes matrices column by column
+                pose_bones.foreach_set('matrix_basis', basis.transpose(0, 2, 1).ravel())
+                recipient.update_tag(refresh={'DATA'})
+            profile_count("bones", len(bone_map))
 
         self.report({'INFO'}, "Bone transforms copied successfully in Pose Mode.")
         return {'FINISHED'}
 
+# Operator to bake a retarget from the donor into actions on the recipients
+class BakeRetargetOperator(bpy.types.Operator):
+    """Bake the donor's animation over a frame range into actions on the selected recipient armatures"""
+    bl_idname = "object.bake_retarget"
+    bl_label = "Bake Retarget"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    space: bpy.props.EnumProperty(
+        items=[
+            ('LOCAL', "Local Space", "Copy the local bone transforms like Local Space constraints"),
+            ('WORLD', "World Space", "Match the world space bone transforms like World Space constraints")
+        ],
+        name="Space",
+        default='LOCAL'
+    )
+
+    use_scene_range: BoolProperty(
+        name="Scene Frame Range",
+        description="Bake the scene frame range instead of the range below",
+        default=True,
+    )
+
+    frame_start: IntProperty(name="Start Frame", default=1)
+    frame_end: IntProperty(name="End Frame", default=250)
+    frame_step: IntProperty(name="Frame Step", default=1, min=1)
+
+    remove_constraints: BoolProperty(
+        name="Remove Constraints",
+        description="Remove the constraints created towards the donor after baking",
+        default=True,
+    )
+
+    @instrumented
+    def execute(self, context):
+        selected_objects = context.selected_objects
+
+        if len(selected_objects) < 2:
+            self.report({'WARNING'}, "Select at least two armatures.")
+            return {'CANCELLED'}
+
+        donor_armature = selected_objects[-1]  # last selected
+        recipients = selected_objects[:-1]  # all other selected objects
+
+        if donor_armature.type != 'ARMATURE' or any(recipient.type != 'ARMATURE' for recipient in recipients):
+            self.report({'WARNING'}, "Both objects must be armatures.")
+            return {'CANCELLED'}
+
+        scene = context.scene
+        if self.use_scene_range:
+            frames = np.arange(scene.frame_start, scene.frame_end + 1, scene.frame_step)
+        else:
+            frames = np.arange(self.frame_start, self.frame_end + 1, self.frame_step)
+        if not len(frames):
+            self.report({'WARNING'}, "Empty frame range.")
+            return {'CANCELLED'}
+
+        # Bone mapping between the donor and each recipient
+        remap = scene_bone_remap(context)
+        donor_index = {bone.name: i for i, bone in enumerate(donor_armature.pose.bones)}
+        bone_maps = [get_bone_map(donor_armature, recipient, remap) for recipient in recipients]
+
+        # Step the frame range once and capture every donor pose into a preallocated buffer
+        buffer = np.empty((len(frames), len(donor_index), 4, 4), dtype=np.float32)
+        world = np.empty((len(frames), 4, 4), dtype=np.float32)
+        frame_current = scene.frame_current
+        depsgraph = context.evaluated_depsgraph_get()
+        with profile_phase("frame stepping"):
+            for i, frame in enumerate(frames):
+                scene.frame_set(int(frame))
+                evaluated = donor_armature.evaluated_get(depsgraph)
+                buffer[i] = read_matrix_array(evaluated.pose.bones, 'matrix')
+                world[i] = np.array(evaluated.matrix_world, dtype=np.float32)
+            scene.frame_set(frame_current)
+        profile_count("frames", len(frames))
+        profile_count("donor bones", len(donor_index))
+        if self.space == 'LOCAL':
+            # Local pose from the evaluated pose, so the donor's own constraints and IK are baked too
+            buffer = pose_to_basis(donor_armature, list(donor_index), buffer)
+
+        for recipient, bone_map in zip(recipients, bone_maps):
+            if not bone_map:
+                continue
+            poses = buffer[:, [donor_index[donor_name] for donor_name, _ in bone_map]]
+            names = [recipient_name for _, recipient_name in bone_map]
+            if self.space == 'LOCAL':
+                basis = poses
+            else:
+                to_recipient = np.linalg.inv(np.array(recipient.matrix_world, dtype=np.float32)) @ world
+                basis = pose_to_basis(recipient, names, to_recipient[:, None] @ poses)
+            locations, quaternions, scales, rotations = decompose_matrices(basis)
+
+            # Keep consecutive quaternions in the same hemisphere
+            flips = np.where(np.einsum('fbk,fbk->fb', quaternions[1:], quaternions[:-1]) < 0.0, -1.0, 1.0)
+            quaternions[1:] *= np.cumprod(flips, axis=0)[..., None]
+
+            action = bpy.data.actions.new(f"{recipient.name}_{donor_armature.name}_bake")
+            if recipient.animation_data is None:
+                recipient.animation_data_create()
+            recipient.animation_data.action = action
+
+            for b, name in enumerate(names):
+                pose_bone = recipient.pose.bones[name]
+                prefix = f'pose.bones["{bpy.utils.escape_identifier(name)}"]'
+                channels = [("location", locations[:, b]), ("scale", scales[:, b])]
+                if pose_bone.rotation_mode == 'QUATERNION':
+                    channels.append(("rotation_quaternion", quaternions[:, b]))
+                elif pose_bone.rotation_mode == 'AXIS_ANGLE':
+                    half_angles = np.arccos(np.clip(quaternions[:, b, 0], -1.0, 1.0))
+                    axes = quaternions[:, b, 1:] / np.maximum(np.sin(half_angles), 1e-8)[:, None]
+                    channels.append(("rotation_axis_angle", np.column_stack([2 * half_angles, axes])))
+                else:
+                    # Euler orders are converted key by key, each compatible with the previous key
+                    eulers = [mathutils.Matrix(rotations[0, b].tolist()).to_euler(pose_bone.rotation_mode)]
+                    for rotation in rotations[1:, b]:
+                        eulers.append(mathutils.Matrix(rotation.tolist()).to_euler(pose_bone.rotation_mode, eulers[-1]))
+                    channels.append(("rotation_euler", np.array(eulers, dtype=np.float32)))
+
+                for channel, values in channels:
+                    for index in range(values.shape[1]):
+                        write_fcurve_keys(action, f"{prefix}.{channel}", index, name, frames, values[:, index])
+
+            if self.remove_constraints:
+                remove_tracked_constraints(recipient, donor_armature.name)
+
+        self.report({'INFO'}, f"Baked {len(frames)} frames to {len(recipients)} armatures.")
+        return {'FINISHED'}
+
 # Operator to symmetrize and smooth weights
-class SymmetrizeAndSmoothWeightsOperator(bpy.types.Operator):
+class SymmetrizeAndSmoothWeightsOperator(bpy.types.Operator, ChunkedWeightJob):
     """Symmetrize and smooth weights across a specified axis"""
     bl_idname = "object.symmetrize_and_smooth_weights"
     bl_label = "Symmetrize and Smooth Weights"
@@ -439,6 +2712,30 @@ class SymmetrizeAndSmoothWeightsOperator(bpy.types.Operator):
         default='X'
     )
 
+    tolerance: FloatProperty(
+        name="Tolerance",
+        description="Maximum distance between a mirrored vertex and its counterpart",
+        default=0.001,
+        min=0.0,
+        precision=4,
+    )
+
+    use_name_swap: BoolProperty(
+        name="Swap Left/Right Groups",
+        description="Average each weight with the mirrored vertex's weight in the opposite side group (.L/.R, _l/_r)",
+        default=True,
+    )
+
+    cache_storage: bpy.props.EnumProperty(
+        items=[
+            ('MEMORY', "Memory", "Keep the mirror map in memory for this session"),
+            ('PROPERTY', "Mesh Property", "Also store the mirror map as a custom property of the mesh"),
+            ('FILE', "Sidecar File", "Also store the mirror map as a .npy file next to the .blend file")
+        ],
+        name="Mirror Map Cache",
+        default='MEMORY'
+    )
+
     @classmethod
     def poll(cls, context):
         obj = context.active_object
@@ -451,110 +2748,94 @@ class SymmetrizeAndSmoothWeightsOperator(bpy.types.Operator):
             )
         )
 
-    def execute(self, context):
-        obj = context.active_object
-        mesh = obj.data
-        axis_index = {'X': 0, 'Y': 1, 'Z': 2}[self.axis]
-
+    def prepare(self, context):
         # Ensure we are in Object Mode to access vertex groups
-        bpy.ops.object.mode_set(mode='OBJECT')
+        set_mode('OBJECT')
 
-        vgroups = obj.vertex_groups
-
-        if not vgroups:
+        objects = [obj for obj in selected_meshes(context) if obj.vertex_groups]
+        if not objects:
             self.report({'WARNING'}, "Object has no vertex groups")
-            return {'CANCELLED'}
-
-        # Build a KDTree for efficient spatial searches
-        size = len(mesh.vertices)
-        kd = mathutils.kdtree.KDTree(size)
-
-        for i, v in enumerate(mesh.vertices):
-            kd.insert(v.co, i)
-        kd.balance()
-
-        # Dictionary to store processed vertex pairs
-        processed_verts = {}
-
-        for v in mesh.vertices:
-            index = v.index
-            if index in processed_verts:
-                continue
+            self.restore_mode()
+            return None
+        return objects
 
-            # Find the symmetric point
-            coord = v.co.copy()
-            coord[axis_index] *= -1  # Mirror across the selected axis
-
-            # Find the nearest vertex to the mirrored coordinate
-            _, sym_index, _ = kd.find(coord)
-
-            if sym_index == index:
-                # Vertex is on the symmetry plane
-                continue
-
-            if sym_index in processed_verts:
-                continue
-
-            # Average the weights of the vertex and its symmetric counterpart
-            for vgroup in vgroups:
-                try:
-                    weight = vgroup.weight(index)
-                except RuntimeError:
-                    weight = 0.0
-                try:
-                    sym_weight = vgroup.weight(sym_index)
-                except RuntimeError:
-                    sym_weight = 0.0
-
-                avg_weight = (weight + sym_weight) / 2
-
-                # Set the averaged weight to both vertices
-                if avg_weight > 0.0:
-                    vgroup.add([index, sym_index], avg_weight, 'REPLACE')
-                else:
-                    vgroup.remove([index, sym_index])
-
-            # Mark vertices as processed
-            processed_verts[index] = True
-            processed_verts[sym_index] = True
-
-        # Normalize weights
-        for v in mesh.vertices:
-            total_weight = 0.0
-            weights = {}
-            for g in v.groups:
-                weights[g.group] = g.weight
-                total_weight += g.weight
-
-            if total_weight > 0.0:
-                for group_idx, weight in weights.items():
-                    normalized_weight = weight / total_weight
-                    vgroups[group_idx].add([v.index], normalized_weight, 'REPLACE')
+    def load_object(self, obj):
+        mesh = obj.data
+        vgroups = obj.vertex_groups
+        axis_index = {'X': 0, 'Y': 1, 'Z': 2}[self.axis]
 
+        # Vertex pairs from the cached mirror map, the KD-tree is only built on a cache miss
+        yield 0.0
+        mirror_map = get_mirror_map(mesh, axis_index, self.tolerance, self.cache_storage)
+        pairs_a, pairs_b = mirror_pairs(mirror_map)
+        group_perm = None
+        center = None
+        if self.use_name_swap:
+            group_perm = mirror_group_permutation(vgroups)
+            center = np.flatnonzero(mirror_map == np.arange(len(mirror_map)))
+
+        # Average every vertex with its counterpart, reading the counterpart through the side swap,
+        # vertices on the symmetry plane are their own counterpart, then normalize weights
+        weight_matrix = yield from WeightMatrix.iter_from_object(obj)
+        return weight_matrix, lambda: weight_matrix.mirror(pairs_a, pairs_b, group_perm, center).normalize()
+
+    def finish(self, context, results):
         # Return to previous mode
-        if context.mode == 'EDIT_MESH':
-            bpy.ops.object.mode_set(mode='EDIT')
-        elif context.mode == 'PAINT_WEIGHT':
-            bpy.ops.object.mode_set(mode='WEIGHT_PAINT')
+        self.restore_mode()
 
         self.report({'INFO'}, f"Weights symmetrized and smoothed across {self.axis}-axis.")
-        return {'FINISHED'}
 
 # Operator to distribute weights based on distance from bone
-class DistributeWeightsByDistanceOperator(bpy.types.Operator):
-    """Distribute weights based on distance from active bone"""
+class DistributeWeightsByDistanceOperator(bpy.types.Operator, ChunkedWeightJob):
+    """Distribute weights based on distance from the active bone or across all selected bones"""
     bl_idname = "object.distribute_weights_by_distance"
     bl_label = "Distribute Weights by Distance"
     bl_options = {'REGISTER', 'UNDO'}
 
+    mode: bpy.props.EnumProperty(
+        items=[
+            ('ACTIVE', "Active Bone", "Set the weights of the active bone's vertex group"),
+            ('SELECTED', "Selected Bones", "Distribute normalized weights across all selected pose bones")
+        ],
+        name="Mode",
+        default='ACTIVE'
+    )
+
+    falloff: bpy.props.EnumProperty(
+        items=[
+            ('LINEAR', "Linear", "Linear falloff"),
+            ('SMOOTH', "Smooth", "Smoothstep falloff"),
+            ('SPHERE', "Sphere", "Spherical falloff"),
+            ('ROOT', "Root", "Square root falloff"),
+            ('SHARP', "Sharp", "Quadratic falloff")
+        ],
+        name="Falloff",
+        default='LINEAR'
+    )
+
     modifier: FloatProperty(
         name="Modifier",
-        description="Modifier between -1 and 1 to adjust weight distribution",
+        description="Modifier between -1 and 1 to adjust weight distribution (Active Bone mode)",
         default=1.0,
         min=-1.0,
         max=1.0,
     )
 
+    sharpness: FloatProperty(
+        name="Sharpness",
+        description="How quickly the influence of farther bones fades (Selected Bones mode)",
+        default=4.0,
+        min=0.1,
+        max=16.0,
+    )
+
+    max_influences: IntProperty(
+        name="Max Influences",
+        description="Maximum number of bone influences per vertex (Selected Bones mode)",
+        default=4,
+        min=1,
+    )
+
     @classmethod
     def poll(cls, context):
         obj = context.active_object
@@ -564,76 +2845,624 @@ class DistributeWeightsByDistanceOperator(bpy.types.Operator):
             context.mode == 'EDIT_MESH'
         )
 
-    def execute(self, context):
+    def prepare(self, context):
         obj = context.active_object
-        mesh = obj.data
 
-        # Get selected vertices
-        bm = bmesh.from_edit_mesh(mesh)
-        selected_verts = [v for v in bm.verts if v.select]
-
-        if not selected_verts:
-            self.report({'WARNING'}, "No vertices selected")
-            return {'CANCELLED'}
-
-        # Get the active bone in Pose mode
+        # Get the active or selected bones in Pose mode
         armature = obj.find_armature()
         if not armature or armature.mode != 'POSE':
             self.report({'WARNING'}, "An armature in Pose mode must be active")
-            return {'CANCELLED'}
+            return None
+
+        if self.mode == 'ACTIVE':
+            active = armature.data.bones.active
+            bones = [armature.pose.bones.get(active.name)] if active else []
+            bones = [bone for bone in bones if bone]
+        else:
+            bones = [bone for bone in armature.pose.bones if bone.bone.select]
+
+        if not bones:
+            self.report({'WARNING'}, "No active bone found" if self.mode == 'ACTIVE' else "No bones selected")
+            return None
+
+        # Every selected mesh deformed by the same armature
+        objects = [mesh for mesh in selected_meshes(context) if mesh.find_armature() == armature]
+        if self.mode == 'ACTIVE':
+            objects = [mesh for mesh in objects if mesh.vertex_groups.get(bones[0].name)]
+            if not objects:
+                self.report({'WARNING'}, f"No vertex group found for bone '{bones[0].name}'")
+                return None
+
+        # Switch to Object Mode to modify vertex groups, this also flushes the selection
+        set_mode('OBJECT')
+
+        self.selections = {}
+        for mesh in objects:
+            selection = np.zeros(len(mesh.data.vertices), dtype=bool)
+            mesh.data.vertices.foreach_get('select', selection)
+            if selection.any():
+                self.selections[mesh.name] = np.flatnonzero(selection)
+
+        if not self.selections:
+            self.report({'WARNING'}, "No vertices selected")
+            set_mode('EDIT')
+            return None
+
+        # World space bone segments
+        self.heads = np.array([armature.matrix_world @ bone.head for bone in bones], dtype=np.float32)
+        self.tails = np.array([armature.matrix_world @ bone.tail for bone in bones], dtype=np.float32)
+        self.bone_names = [bone.name for bone in bones]
+        return [mesh for mesh in objects if mesh.name in self.selections]
+
+    def load_object(self, obj):
+        mesh = obj.data
+        vgroups = obj.vertex_groups
+        selected = self.selections[obj.name]
+
+        # World space vertex positions
+        matrix_world = np.array(obj.matrix_world, dtype=np.float32)
+        coords = read_vertex_coords(mesh)[selected] @ matrix_world[:3, :3].T + matrix_world[:3, 3]
+
+        target_groups = np.array(
+            [(vgroups.get(name) or vgroups.new(name=name)).index for name in self.bone_names], dtype=np.int32)
+        weight_matrix = yield from WeightMatrix.iter_from_object(obj)
+
+        heads, tails = self.heads, self.tails
+        curve = FALLOFF_CURVES[self.falloff]
+        mode = self.mode
+        modifier = self.modifier
+        sharpness = self.sharpness
+        max_influences = self.max_influences
+
+        def compute():
+            distances = segment_distances(coords, heads, tails)
+
+            if mode == 'ACTIVE':
+                # Normalize distances to range between 0 and 1
+                distances = distances[:, 0]
+                min_dist = distances.min()
+                dist_range = distances.max() - min_dist
+                normalized_dist = curve((distances - min_dist) / (dist_range if dist_range > 0 else 1.0))
+
+                # Adjust weight based on modifier
+                if modifier >= 0:
+                    new_weights = (1 - normalized_dist) * (1 - modifier) + normalized_dist * modifier
+                else:
+                    new_weights = normalized_dist * (1 + modifier) + (1 - normalized_dist) * -modifier
+                new_weights = np.clip(new_weights, 0.0, 1.0)[:, None]
+            else:
+                # Closeness relative to the nearest bone, 1 for the nearest one
+                nearest = distances.min(axis=1, keepdims=True)
+                closeness = np.divide(nearest, distances, out=np.ones_like(distances), where=distances > 0)
+                new_weights = curve(closeness) ** sharpness
+                normalize_rows(limit_row_influences(new_weights, max_influences))
 
-        active_bone = armature.pose.bones.get(armature.data.bones.active.name)
-        if not active_bone:
-            self.report({'WARNING'}, "No active bone found")
+            # Replace the target groups' weights of the selected vertices in one batched write
+            weight_matrix.set_dense(selected, new_weights, target_groups, keep_zeros=mode == 'ACTIVE')
+
+        return weight_matrix, compute
+
+    def finish(self, context, results):
+        # Return to Edit Mode
+        set_mode('EDIT')
+
+        if self.mode == 'ACTIVE':
+            self.report({'INFO'}, "Weights adjusted based on distance from bone.")
+        else:
+            self.report({'INFO'}, f"Weights distributed across {len(self.bone_names)} bones.")
+
+
+# Heat diffusion solutions by mesh, pose and bones, re-runs with other limits skip the solve.
+# The last solution of every mesh also starts the NumPy solver after bones changed.
+HEAT_CACHE_SIZE = 4
+_heat_cache = OrderedDict()
+_heat_starts = OrderedDict()
+
+
+# Operator to weight bones by heat diffusion over the mesh surface
+class HeatDiffuseWeightsOperator(bpy.types.Operator, ChunkedWeightJob):
+    """Weight the selected deform bones by heat diffusion over the mesh surface, which does not leak across gaps like distance falloff"""
+    bl_idname = "object.heat_diffuse_weights"
+    bl_label = "Heat Diffuse Weights"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    max_influences: IntProperty(
+        name="Max Influences",
+        description="Maximum number of bone influences per vertex",
+        default=4,
+        min=1,
+    )
+
+    threshold: FloatProperty(
+        name="Threshold",
+        description="Heat weights below this value are removed before normalizing",
+        default=0.01,
+        min=0.0,
+        max=1.0,
+    )
+
+    only_selected: BoolProperty(
+        name="Only Selected Vertices",
+        description="Only replace the weights of the selected vertices, the heat still diffuses over the whole mesh",
+        default=False,
+    )
+
+    @classmethod
+    def poll(cls, context):
+        obj = context.active_object
+        return obj is not None and obj.type == 'MESH' and obj.find_armature() is not None
+
+    def prepare(self, context):
+        armature = context.active_object.find_armature()
+
+        # Selected deform bones, all deform bones when none is selected
+        deform_bones = [bone for bone in armature.data.bones if bone.use_deform]
+        bones = [bone for bone in deform_bones if bone.select] or deform_bones
+        if not bones:
+            self.report({'WARNING'}, "The armature has no deform bones")
+            return None
+
+        # Switch to Object Mode to modify vertex groups, this also flushes the selection
+        set_mode('OBJECT')
+
+        objects = [mesh for mesh in selected_meshes(context) if mesh.find_armature() == armature and len(mesh.data.polygons)]
+        if not objects:
+            self.report({'WARNING'}, "No mesh with faces is deformed by the armature")
+            self.restore_mode()
+            return None
+
+        # World space rest bone segments
+        matrix_world = np.array(armature.matrix_world, dtype=np.float32)
+        self.heads = np.array([bone.head_local for bone in bones], dtype=np.float32) @ matrix_world[:3, :3].T + matrix_world[:3, 3]
+        self.tails = np.array([bone.tail_local for bone in bones], dtype=np.float32) @ matrix_world[:3, :3].T + matrix_world[:3, 3]
+        self.bone_names = [bone.name for bone in bones]
+        return objects
+
+    def load_object(self, obj):
+        mesh = obj.data
+        vgroups = obj.vertex_groups
+
+        # World space vertex positions and triangles
+        matrix_world = np.array(obj.matrix_world, dtype=np.float32)
+        coords = read_vertex_coords(mesh) @ matrix_world[:3, :3].T + matrix_world[:3, 3]
+        mesh.calc_loop_triangles()
+        triangles = np.empty(len(mesh.loop_triangles) * 3, dtype=np.int32)
+        mesh.loop_triangles.foreach_get('vertices', triangles)
+        triangles = triangles.reshape(-1, 3)
+
+        vertices = np.arange(len(coords))
+        if self.only_selected:
+            selection = np.zeros(len(coords), dtype=bool)
+            mesh.vertices.foreach_get('select', selection)
+            if selection.any():
+                vertices = np.flatnonzero(selection)
+
+        digest = hashlib.blake2b(digest_size=16)
+        for array in (coords, triangles):
+            digest.update(array.tobytes())
+        mesh_key = digest.hexdigest()
+        for array in (self.heads, self.tails):
+            digest.update(array.tobytes())
+        key = digest.hexdigest()
+        cached = _heat_cache.get(key)
+
+        # Bones of an earlier solve on this mesh start from their earlier weights
+        x0 = None
+        if cached is None and mesh_key in _heat_starts:
+            start_names, start_heat = _heat_starts[mesh_key]
+            start_index = {name: i for i, name in enumerate(start_names)}
+            x0 = np.full((len(coords), len(self.bone_names)), np.nan)
+            for i, name in enumerate(self.bone_names):
+                if name in start_index:
+                    x0[:, i] = start_heat[:, start_index[name]]
+
+        target_groups = np.array(
+            [(vgroups.get(name) or vgroups.new(name=name)).index for name in self.bone_names], dtype=np.int32)
+        weight_matrix = yield from WeightMatrix.iter_from_object(obj)
+
+        heads, tails = self.heads, self.tails
+        threshold = self.threshold
+        max_influences = self.max_influences
+
+        bone_names = self.bone_names
+
+        def compute():
+            heat = cached
+            if heat is None:
+                heat = yield from iter_bone_heat_weights(coords, triangles, heads, tails, x0=x0)
+            new_weights = np.clip(heat[vertices], 0.0, 1.0).astype(np.float32)
+            new_weights[new_weights < threshold] = 0.0
+            normalize_rows(limit_row_influences(new_weights, max_influences))
+            weight_matrix.set_dense(vertices, new_weights, target_groups)
+            return key, mesh_key, bone_names, heat, cached is None
+
+        return weight_matrix, compute
+
+    def finish(self, context, results):
+        for obj, (key, mesh_key, bone_names, heat, solved) in results:
+            for cache, cache_key, value in ((_heat_cache, key, heat), (_heat_starts, mesh_key, (bone_names, heat))):
+                cache[cache_key] = value
+                cache.move_to_end(cache_key)
+                while len(cache) > HEAT_CACHE_SIZE:
+                    cache.popitem(last=False)
+
+        self.restore_mode()
+        message = f"Heat weights of {len(self.bone_names)} bones on {len(results)} meshes"
+        if sparse is None and any(solved for obj, (key, mesh_key, bone_names, heat, solved) in results):
+            self.report({'WARNING'}, f"{message}, solved without SciPy, installing SciPy into Blender's Python makes it much faster")
+        else:
+            self.report({'INFO'}, message)
+
+
+# Operator to transfer weights from the active mesh to the selected meshes
+class TransferWeightsOperator(bpy.types.Operator, ChunkedWeightJob):
+    """Transfer vertex group weights from the active mesh to the other selected meshes, matching them in world space"""
+    bl_idname = "object.transfer_weights"
+    bl_label = "Transfer Weights"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    method: bpy.props.EnumProperty(
+        items=[
+            ('SURFACE', "Nearest Surface", "Interpolate the weights at the closest point on the source triangles"),
+            ('VERTEX', "Nearest Vertex", "Copy the weights of the nearest source vertex")
+        ],
+        name="Method",
+        default='SURFACE'
+    )
+
+    max_influences: IntProperty(
+        name="Max Influences",
+        description="Maximum number of bone influences per vertex, 0 for no limit",
+        default=4,
+        min=0,
+    )
+
+    @classmethod
+    def poll(cls, context):
+        return context.active_object is not None and context.active_object.type == 'MESH'
+
+    def prepare(self, context):
+        source = context.active_object
+
+        # Ensure we're in Object Mode
+        set_mode('OBJECT')
+
+        targets = selected_meshes(context)[1:]
+        if not targets:
+            self.report({'WARNING'}, "Select the target meshes and make the source mesh active")
+            self.restore_mode()
+            return None
+        if not source.vertex_groups:
+            self.report({'WARNING'}, "Object has no vertex groups")
+            self.restore_mode()
+            return None
+
+        # World space source geometry
+        mesh = source.data
+        matrix_world = np.array(source.matrix_world, dtype=np.float32)
+        self.source_coords = read_vertex_coords(mesh) @ matrix_world[:3, :3].T + matrix_world[:3, 3]
+        if self.method == 'SURFACE':
+            mesh.calc_loop_triangles()
+            triangles = np.empty(len(mesh.loop_triangles) * 3, dtype=np.int32)
+            mesh.loop_triangles.foreach_get('vertices', triangles)
+            self.triangles = triangles.reshape(-1, 3)
+            if not len(self.triangles):
+                self.report({'WARNING'}, "The source mesh has no faces, use Nearest Vertex")
+                self.restore_mode()
+                return None
+            with profile_phase("bvh tree"):
+                self.tree = mathutils.bvhtree.BVHTree.FromPolygons(self.source_coords.tolist(), self.triangles.tolist())
+
+        self.source_weights = WeightMatrix.from_object(source)
+        self.source_group_names = [vgroup.name for vgroup in source.vertex_groups]
+        return targets
+
+    def load_object(self, obj):
+        # World space target vertices
+        matrix_world = np.array(obj.matrix_world, dtype=np.float32)
+        coords = read_vertex_coords(obj.data) @ matrix_world[:3, :3].T + matrix_world[:3, 3]
+
+        if self.method == 'SURFACE':
+            with profile_phase("bvh tree"):
+                triangles, locations = yield from iter_closest_surface_points(self.tree, coords)
+            corners = self.triangles[triangles]
+            source_coords = self.source_coords
+        else:
+            with profile_phase("kd-tree"):
+                nearest, _ = nearest_indices(self.source_coords, coords)
+
+        # Source groups by name, created where missing
+        vgroups = obj.vertex_groups
+        group_map = np.array(
+            [(vgroups.get(name) or vgroups.new(name=name)).index for name in self.source_group_names], dtype=np.int32)
+        weight_matrix = yield from WeightMatrix.iter_from_object(obj)
+
+        source = self.source_weights
+        method = self.method
+        max_influences = self.max_influences
+
+        def compute():
+            if method == 'SURFACE':
+                a, b, c = source_coords[corners].transpose(1, 0, 2)
+                sources, factors = corners, barycentric_weights(locations, a, b, c)
+            else:
+                sources, factors = nearest[:, None], np.ones((len(nearest), 1), dtype=np.float32)
+            indptr, groups, weights = blend_csr_rows(source.indptr, source.groups, source.weights, sources, factors)
+            weight_matrix.replace_groups(group_map, indptr, group_map[groups], weights)
+            if max_influences:
+                weight_matrix.limit(max_influences)
+            weight_matrix.normalize()
+
+        return weight_matrix, compute
+
+    def finish(self, context, results):
+        self.restore_mode()
+        self.report({'INFO'}, f"Transferred {len(self.source_group_names)} groups to {len(results)} meshes")
+
+
+# Operator to export vertex group weights to a snapshot file
+class ExportWeightsOperator(bpy.types.Operator, ExportHelper):
+    """Save the vertex group weights of the active mesh to a file, to restore them later or on another mesh revision"""
+    bl_idname = "object.export_weights"
+    bl_label = "Export Weights"
+
+    filename_ext = ".npz"
+    filter_glob: StringProperty(default="*.npz", options={'HIDDEN'})
+
+    memory_mappable: BoolProperty(
+        name="Memory-Mappable",
+        description="Write uncompressed .npy arrays into a .weights folder instead of one compressed .npz file",
+        default=False,
+    )
+
+    @classmethod
+    def poll(cls, context):
+        return context.active_object is not None and context.active_object.type == 'MESH'
+
+    @instrumented
+    def execute(self, context):
+        obj = context.active_object
+
+        if not obj.vertex_groups:
+            self.report({'WARNING'}, "Object has no vertex groups")
             return {'CANCELLED'}
 
-        bone_head = armature.matrix_world @ active_bone.head
-        bone_tail = armature.matrix_world @ active_bone.tail
+        # Edit Mode changes are only in the mesh data after a flush
+        if obj.mode == 'EDIT':
+            obj.update_from_editmode()
+
+        weight_matrix = WeightMatrix.from_object(obj)
+        path = save_weight_snapshot(self.filepath, obj, weight_matrix, self.memory_mappable)
+
+        self.report({'INFO'}, f"Exported {len(weight_matrix.weights)} weights in {len(obj.vertex_groups)} groups to {path}")
+        return {'FINISHED'}
+
+
+# Operator to import vertex group weights from a snapshot file
+class ImportWeightsOperator(bpy.types.Operator, ImportHelper):
+    """Restore vertex group weights from a snapshot, the snapshot's groups are replaced by name"""
+    bl_idname = "object.import_weights"
+    bl_label = "Import Weights"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    filter_glob: StringProperty(default="*.npz;*.npy", options={'HIDDEN'})
+
+    match: bpy.props.EnumProperty(
+        items=[
+            ('INDEX', "Vertex Index", "Match vertices by index, the mesh must have the snapshot's vertex count"),
+            ('POSITION', "Nearest Position", "Give every vertex the weights of the nearest snapshot vertex, for edited mesh revisions")
+        ],
+        name="Match",
+        default='INDEX'
+    )
+
+    @classmethod
+    def poll(cls, context):
+        return context.active_object is not None and context.active_object.type == 'MESH'
 
-        # Calculate bone direction vector
-        bone_dir = (bone_tail - bone_head).normalized()
+    @instrumented
+    def execute(self, context):
+        obj = context.active_object
+        previous_mode = INTERACTIVE_MODES.get(context.mode)
 
-        # Adjust weights based on distance
-        vgroup = obj.vertex_groups.get(active_bone.name)
-        if not vgroup:
-            self.report({'WARNING'}, f"No vertex group found for bone '{active_bone.name}'")
+        try:
+            snapshot = load_weight_snapshot(self.filepath)
+        except (OSError, KeyError, ValueError) as exc:
+            self.report({'ERROR'}, f"Could not read a weight snapshot from {self.filepath}: {exc}")
             return {'CANCELLED'}
 
-        # Switch to Object Mode to modify vertex groups
-        bpy.ops.object.mode_set(mode='OBJECT')
+        # Ensure we're in Object Mode
+        set_mode('OBJECT')
+
+        num_vertices = len(obj.data.vertices)
+        if self.match == 'INDEX':
+            if len(snapshot["indptr"]) - 1 != num_vertices:
+                self.report({'WARNING'}, f"The snapshot has {len(snapshot['indptr']) - 1} vertices and the mesh {num_vertices}, match by Nearest Position")
+                if previous_mode:
+                    set_mode(previous_mode)
+                return {'CANCELLED'}
+            rows = np.arange(num_vertices)
+        else:
+            with profile_phase("kd-tree"):
+                rows, _ = nearest_indices(np.asarray(snapshot["coords"]), read_vertex_coords(obj.data))
 
-        distances = []
-        for v in selected_verts:
-            world_co = obj.matrix_world @ v.co
-            # Project vertex onto bone direction
-            proj_length = (world_co - bone_head).dot(bone_dir)
-            proj_point = bone_head + bone_dir * proj_length
-            distance = (world_co - proj_point).length
-            distances.append((v.index, distance))
-
-        # Normalize distances to range between 0 and 1
-        min_dist = min(distances, key=lambda x: x[1])[1]
-        max_dist = max(distances, key=lambda x: x[1])[1]
-        dist_range = max_dist - min_dist if max_dist != min_dist else 1.0
-
-        for idx, dist in distances:
-            normalized_dist = (dist - min_dist) / dist_range
-
-            # Adjust weight based on modifier
-            if self.modifier >= 0:
-                weight = (1 - normalized_dist) * (1 - self.modifier) + normalized_dist * self.modifier
-            else:
-                weight = normalized_dist * (1 + self.modifier) + (1 - normalized_dist) * -self.modifier
+        # Snapshot entries of the matched vertices, only these pages of a memory-mapped snapshot are read
+        indptr, positions = csr_take(np.asarray(snapshot["indptr"]), rows)
 
-            # Ensure weight is between 0 and 1
-            weight = max(0.0, min(1.0, weight))
+        # Snapshot groups by name, created where missing
+        vgroups = obj.vertex_groups
+        group_map = np.array(
+            [(vgroups.get(name) or vgroups.new(name=name)).index for name in snapshot["group_names"].tolist()], dtype=np.int32)
 
-            vgroup.add([idx], weight, 'REPLACE')
+        weight_matrix = WeightMatrix.from_object(obj)
+        weight_matrix.replace_groups(group_map, indptr, group_map[snapshot["groups"][positions]], snapshot["weights"][positions])
+        num_removed, num_written = weight_matrix.commit(obj)
 
-        # Return to Edit Mode
-        bpy.ops.object.mode_set(mode='EDIT')
+        # Return to previous mode
+        if previous_mode:
+            set_mode(previous_mode)
 
-        self.report({'INFO'}, "Weights adjusted based on distance from bone.")
+        self.report({'INFO'}, f"Imported weights of {len(group_map)} groups: {num_written} written, {num_removed} removed")
+        return {'FINISHED'}
+
+
+# Read-only weight quality report
+class AnalyzeWeightsOperator(bpy.types.Operator):
+    """Report influence counts, unnormalized, unweighted and asymmetric vertices and unused groups without changing the weights"""
+    bl_idname = "object.analyze_weights"
+    bl_label = "Analyze Weights"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    max_influences: IntProperty(
+        name="Max Influences",
+        description="Vertices with more bone influences are reported",
+        default=4,
+        min=1,
+    )
+
+    epsilon: FloatProperty(
+        name="Normalization Tolerance",
+        description="Vertices whose weights sum further than this from 1 are reported as unnormalized",
+        default=0.0001,
+        min=0.0,
+        precision=5,
+    )
+
+    check_symmetry: BoolProperty(
+        name="Check Symmetry",
+        description="Compare every vertex with its mirrored vertex in the opposite side groups (.L/.R, _l/_r)",
+        default=True,
+    )
+
+    axis: bpy.props.EnumProperty(
+        items=[
+            ('X', "X Axis", "Mirror across X Axis"),
+            ('Y', "Y Axis", "Mirror across Y Axis"),
+            ('Z', "Z Axis", "Mirror across Z Axis")
+        ],
+        name="Axis",
+        default='X'
+    )
+
+    tolerance: FloatProperty(
+        name="Tolerance",
+        description="Maximum distance between a mirrored vertex and its counterpart",
+        default=0.001,
+        min=0.0,
+        precision=4,
+    )
+
+    symmetry_tolerance: FloatProperty(
+        name="Asymmetry Threshold",
+        description="Mirrored vertices whose weights differ by more than this are reported as asymmetric",
+        default=0.01,
+        min=0.0,
+        max=1.0,
+    )
+
+    select: bpy.props.EnumProperty(
+        items=[
+            ('NONE', "None", "Keep the vertex selection"),
+            ('OVER_LIMIT', "Over Limit", "Select the vertices with more than Max Influences"),
+            ('UNNORMALIZED', "Unnormalized", "Select the vertices whose weights do not sum to 1"),
+            ('UNWEIGHTED', "Unweighted", "Select the vertices without weights"),
+            ('ASYMMETRIC', "Asymmetric", "Select the vertices that differ from their mirrored vertex"),
+            ('ALL', "All Problems", "Select the vertices with any of the problems")
+        ],
+        name="Select",
+        default='NONE'
+    )
+
+    @classmethod
+    def poll(cls, context):
+        return context.active_object is not None and context.active_object.type == 'MESH'
+
+    @instrumented
+    def execute(self, context):
+        previous_mode = INTERACTIVE_MODES.get(context.mode)
+        axis_index = {'X': 0, 'Y': 1, 'Z': 2}[self.axis]
+        problems = WEIGHT_PROBLEMS if self.select == 'ALL' else (self.select.lower(),)
+        # Asymmetric vertices are only known with the symmetry check, the selection is kept otherwise
+        select = self.select
+        if select == 'ASYMMETRIC' and not self.check_symmetry:
+            select = 'NONE'
+
+        # Ensure we're in Object Mode
+        set_mode('OBJECT')
+
+        objects = selected_meshes(context)
+        totals = dict.fromkeys(WEIGHT_PROBLEMS, 0)
+        for obj in objects:
+            weight_matrix = WeightMatrix.from_object(obj)
+            group_names = [vgroup.name for vgroup in obj.vertex_groups]
+            armature = obj.find_armature()
+            bone_names = {bone.name for bone in armature.data.bones} if armature else None
+
+            mirror_map = group_perm = None
+            if self.check_symmetry:
+                mirror_map = get_mirror_map(obj.data, axis_index, self.tolerance)
+                group_perm = mirror_group_permutation(obj.vertex_groups)
+
+            report, masks = analyze_weights(
+                weight_matrix, group_names, self.max_influences, self.epsilon, bone_names,
+                mirror_map, group_perm, self.symmetry_tolerance)
+            _weight_reports[obj.name] = report
+            for name in WEIGHT_PROBLEMS:
+                totals[name] += report[name] or 0
+
+            if select != 'NONE':
+                selection = np.zeros(weight_matrix.num_vertices, dtype=bool)
+                for name in problems:
+                    if name in masks:
+                        selection |= masks[name]
+                obj.data.vertices.foreach_set('select', selection)
+
+        # Return to previous mode
+        if previous_mode:
+            set_mode(previous_mode)
+
+        message = (f"Analyzed {len(objects)} meshes: {totals['over_limit']} vertices over {self.max_influences} influences, "
+                   f"{totals['unnormalized']} unnormalized, {totals['unweighted']} unweighted, {totals['asymmetric']} asymmetric")
+        if select != self.select:
+            self.report({'WARNING'}, f"{message}, selection kept, enable Check Symmetry to select asymmetric vertices")
+        else:
+            self.report({'INFO'}, message)
+        return {'FINISHED'}
+
+
+# Operator to save the cProfile trace of the last instrumented run
+class SaveProfileOperator(bpy.types.Operator, ExportHelper):
+    """Save the cProfile trace of the last instrumented operator run, readable with pstats or snakeviz"""
+    bl_idname = "object.techanim_save_profile"
+    bl_label = "Save Profile"
+
+    filename_ext = ".prof"
+    filter_glob: StringProperty(default="*.prof", options={'HIDDEN'})
+
+    @classmethod
+    def poll(cls, context):
+        return _last_cprofile is not None
+
+    def execute(self, context):
+        operator, profiler = _last_cprofile
+        profiler.dump_stats(self.filepath)
+
+        # The slowest calls also go to the console for a quick look
+        pstats.Stats(profiler).sort_stats('cumulative').print_stats(15)
+
+        self.report({'INFO'}, f"Saved the profile of {operator} to {self.filepath}")
+        return {'FINISHED'}
+
+
+class ClearProfileHistoryOperator(bpy.types.Operator):
+    """Clear the recorded operator timings"""
+    bl_idname = "object.techanim_clear_profile_history"
+    bl_label = "Clear Profile History"
+
+    def execute(self, context):
+        global _last_cprofile
+        _profile_history.clear()
+        _last_cprofile = None
         return {'FINISHED'}
 
 
@@ -649,6 +3478,11 @@ class TechAnimToolsPanel(bpy.types.Panel):
         layout = self.layout
         col = layout.column()
 
+        col.label(text="Bone Mapping:")
+        col.prop(context.scene, "techanim_bone_remap", text="Remap")
+
+        col.separator()
+
         col.label(text="Bone Transforms (Edit Mode):")
         col.operator("object.copy_bones_transforms_edit_mode", text="Copy Bones Transforms (Edit Mode)")
 
@@ -662,15 +3496,96 @@ class TechAnimToolsPanel(bpy.types.Panel):
 
         col.label(text="Bone Transforms (Pose Mode):")
         col.operator("object.copy_bones_transforms_pose_mode", text="Copy Bones Transforms (Pose Mode)")
+        col.operator("object.bake_retarget", text="Bake Retarget")
+
+        col.separator()
+
+        col.label(text="Live Retarget:")
+        col.prop(context.scene, "techanim_live_retarget")
+        row = col.row(align=True)
+        row.operator("object.link_live_retarget", text="Link")
+        row.operator("object.unlink_live_retarget", text="Unlink")
+        for recipient_name, link in sorted(live_links(context.scene).items()):
+            col.label(text=f"{recipient_name} <- {link['donor']} ({link.get('space', 'LOCAL').title()})")
 
         col.separator()
 
         col.label(text="Vertex Weight Tools:")
         col.operator("object.clean_up_bone_influences", text="Clean Up Bone Influences")
         col.operator("object.clean_up_weights_threshold", text="Clean Up Weights by Threshold")
+        col.operator("object.quantize_weights", text="Quantize Weights")
+        col.operator("object.compact_vertex_groups", text="Compact Vertex Groups")
         col.operator("object.smooth_selected_vertices_weights", text="Smooth Selected Vertices Weights")
         col.operator("object.symmetrize_and_smooth_weights", text="Symmetrize and Smooth Weights")
         col.operator("object.distribute_weights_by_distance", text="Distribute Weights by Distance")
+        col.operator("object.heat_diffuse_weights", text="Heat Diffuse Weights")
+        col.operator("object.transfer_weights", text="Transfer Weights")
+        row = col.row(align=True)
+        row.operator("object.export_weights", text="Export Weights")
+        row.operator("object.import_weights", text="Import Weights")
+
+        header, body = layout.panel("techanim_weight_analysis", default_closed=True)
+        header.label(text="Weight Analysis")
+        if body:
+            self.draw_weight_analysis(context, body)
+
+        header, body = layout.panel("techanim_profiling", default_closed=True)
+        header.label(text="Profiling")
+        if body:
+            self.draw_profiling(context, body)
+
+    def draw_weight_analysis(self, context, layout):
+        col = layout.column()
+        col.operator("object.analyze_weights", text="Analyze Weights")
+
+        obj = context.active_object
+        report = _weight_reports.get(obj.name) if obj else None
+        if report is None:
+            return
+
+        # Last analysis of the active mesh
+        box = col.box()
+        box.label(text=f"{obj.name}: {report['vertices']} vertices")
+        for count, num_vertices in enumerate(report["histogram"]):
+            if num_vertices:
+                box.label(text=f"{count} influences: {num_vertices}")
+
+        box = col.box()
+        for name, label in (("over_limit", "Over limit"), ("unnormalized", "Unnormalized"),
+                            ("unweighted", "Unweighted"), ("asymmetric", "Asymmetric")):
+            if report[name] is not None:
+                box.label(text=f"{label}: {report[name]}", icon='ERROR' if report[name] else 'CHECKMARK')
+        if report["unmatched"]:
+            box.label(text=f"Without mirrored vertex: {report['unmatched']}")
+        for name, label in (("empty_groups", "Empty groups"), ("unbound_groups", "Groups without bone")):
+            groups = report[name]
+            if groups is not None:
+                box.label(text=f"{label}: {len(groups)}", icon='ERROR' if groups else 'CHECKMARK')
+                if groups:
+                    box.label(text=", ".join(groups[:5]) + (", ..." if len(groups) > 5 else ""))
+
+    def draw_profiling(self, context, layout):
+        col = layout.column()
+        col.prop(context.scene, "techanim_profiling")
+        col.prop(context.scene, "techanim_profiling_cprofile")
+        row = col.row(align=True)
+        row.operator("object.techanim_save_profile", text="Save Profile")
+        row.operator("object.techanim_clear_profile_history", text="Clear")
+
+        if not _profile_history:
+            return
+
+        # Phase breakdown of the last run, one line per older run
+        last = _profile_history[-1]
+        box = col.box()
+        box.label(text=f"{last.operator}: {last.total * 1000:.1f} ms")
+        for name, seconds in list(last.phases.items()) + [("other", last.other)]:
+            box.label(text=f"{name}: {seconds * 1000:.1f} ms ({seconds / max(last.total, 1e-9):.0%})")
+        for name, count in last.counts.items():
+            box.label(text=f"{name}: {count}")
+
+        for record in reversed(list(_profile_history)[:-1]):
+            col.label(text=f"{record.operator}: {record.total * 1000:.1f} ms")
 
 # Panel for UI - Item Tab (for vertex weight operations)
 class ItemWeightToolsPanel(bpy.types.Panel):
@@ -692,37 +3607,235 @@ class ItemWeightToolsPanel(bpy.types.Panel):
         # Adding buttons for operators related to vertex weights
         col.operator("object.clean_up_bone_influences", text="Clean Up Bone Influences")
         col.operator("object.clean_up_weights_threshold", text="Clean Up Weights by Threshold")
+        col.operator("object.quantize_weights", text="Quantize Weights")
+        col.operator("object.compact_vertex_groups", text="Compact Vertex Groups")
         col.operator("object.smooth_selected_vertices_weights", text="Smooth Selected Vertices Weights")
         col.operator("object.symmetrize_and_smooth_weights", text="Symmetrize and Smooth Weights")
         col.operator("object.distribute_weights_by_distance", text="Distribute Weights by Distance")
+        col.operator("object.heat_diffuse_weights", text="Heat Diffuse Weights")
+        col.operator("object.transfer_weights", text="Transfer Weights")
+        col.operator("object.analyze_weights", text="Analyze Weights")
+        row = col.row(align=True)
+        row.operator("object.export_weights", text="Export Weights")
+        row.operator("object.import_weights", text="Import Weights")
+
+
+# Headless batch pipeline:
+#   blender -b file.blend --python TechAnimFriend.py -- --pipeline clean_up_bone_influences:max_influences=4
+# Every pipeline step names an operation and its operator arguments.
+PIPELINE_OPERATIONS = {
+    # name: (operator, object type, mode the operator runs in, needs a donor armature)
+    'clean_up_bone_influences': ("clean_up_bone_influences", 'MESH', 'OBJECT', False),
+    'clean_up_weights_threshold': ("clean_up_weights_threshold", 'MESH', 'OBJECT', False),
+    'quantize_weights': ("quantize_weights", 'MESH', 'OBJECT', False),
+    'compact_vertex_groups': ("compact_vertex_groups", 'MESH', 'OBJECT', False),
+    'symmetrize_and_smooth_weights': ("symmetrize_and_smooth_weights", 'MESH', 'EDIT', False),
+    'create_constraints': ("create_constraints", 'ARMATURE', 'OBJECT', True),
+    'remove_constraints': ("remove_constraints", 'ARMATURE', 'OBJECT', False),
+    'copy_bones_transforms_pose_mode': ("copy_bones_transforms_pose_mode", 'ARMATURE', 'OBJECT', True),
+    'copy_bones_transforms_edit_mode': ("copy_bones_transforms_edit_mode", 'ARMATURE', 'OBJECT', True),
+}
+
+
+def parse_pipeline_step(text):
+    """Parse 'operation:key=value,key=value' into a step dict, values are read as JSON when possible"""
+    name, _, arg_text = text.partition(":")
+    args = {}
+    for item in filter(None, arg_text.split(",")):
+        key, _, value = item.partition("=")
+        try:
+            args[key.strip()] = json.loads(value)
+        except ValueError:
+            args[key.strip()] = value
+    return {"op": name.strip(), "args": args}
+
+
+def _select_only(context, objects, active):
+    if context.object and context.object.mode != 'OBJECT':
+        bpy.ops.object.mode_set(mode='OBJECT')
+    for obj in context.view_layer.objects:
+        obj.select_set(obj in objects)
+    context.view_layer.objects.active = active
+
+
+def run_pipeline_step(context, step):
+    """Run one pipeline step on the matching objects of the open file, returns a list of per-target results"""
+    if step["op"] not in PIPELINE_OPERATIONS:
+        raise ValueError(f"Unknown pipeline operation '{step['op']}'")
+    op_name, obj_type, mode, needs_donor = PIPELINE_OPERATIONS[step["op"]]
+    operator = getattr(bpy.ops.object, op_name)
+    args = dict(step.get("args", {}))
+
+    # Targets are named explicitly or every object of the operation's type
+    names = args.pop("objects", None)
+    donor_name = args.pop("donor", None)
+    targets = [obj for obj in context.scene.objects if obj.type == obj_type]
+    if names:
+        names = set(names.split(";") if isinstance(names, str) else names)
+        targets = [obj for obj in targets if obj.name in names]
+
+    if needs_donor:
+        donor = context.scene.objects.get(donor_name) if donor_name else None
+        if donor is None:
+            raise ValueError(f"Pipeline operation '{step['op']}' needs an existing 'donor' armature")
+        targets = [obj for obj in targets if obj != donor]
+        if not targets:
+            return []
+        groups = [(targets + [donor], donor, donor.name)]
+    elif obj_type == 'ARMATURE':
+        groups = [(targets, targets[0], None)] if targets else []
+    else:
+        groups = [([obj], obj, obj.name) for obj in targets]
+
+    results = []
+    for selected, active, label in groups:
+        _select_only(context, selected, active)
+        if mode == 'EDIT':
+            bpy.ops.object.mode_set(mode='EDIT')
+
+        start = time.perf_counter()
+        with context.temp_override(active_object=active, object=active, selected_objects=selected):
+            result = operator(**args)
+        elapsed = time.perf_counter() - start
+
+        if context.object and context.object.mode != 'OBJECT':
+            bpy.ops.object.mode_set(mode='OBJECT')
+        results.append({"target": label, "result": sorted(result), "seconds": round(elapsed, 4)})
+    return results
+
+
+def run_cli(argv):
+    """Entry point for background Blender runs, returns the process exit code"""
+    parser = argparse.ArgumentParser(
+        prog="blender -b file.blend --python TechAnimFriend.py --",
+        description="Run a TechAnim Friend operator pipeline on the open .blend file",
+    )
+    parser.add_argument("--pipeline", action="append", default=[], metavar="OP[:KEY=VALUE,...]",
+                        help="Pipeline step, repeat for several steps. Use objects=A;B to limit targets and donor=NAME for armature operations")
+    parser.add_argument("--config", help="JSON file with a 'steps' list of {\"op\": ..., \"args\": {...}}")
+    parser.add_argument("--save", action="store_true", help="Save the file in place after the pipeline")
+    parser.add_argument("--output", help="Save the result to this .blend path")
+    parser.add_argument("--report", help="Write the JSON report to this path instead of stdout")
+    args = parser.parse_args(argv)
+
+    steps = []
+    if args.config:
+        with open(args.config) as config_file:
+            steps.extend(json.load(config_file).get("steps", []))
+    steps.extend(parse_pipeline_step(text) for text in args.pipeline)
+
+    context = bpy.context
+    report = {"file": bpy.data.filepath, "steps": [], "ok": True}
+    start = time.perf_counter()
+    for step in steps:
+        step_start = time.perf_counter()
+        entry = {"op": step["op"], "args": step.get("args", {})}
+        try:
+            entry["targets"] = run_pipeline_step(context, step)
+        except Exception as error:
+            entry["error"] = str(error)
+            report["ok"] = False
+        entry["seconds"] = round(time.perf_counter() - step_start, 4)
+        report["steps"].append(entry)
+        if not report["ok"]:
+            break
+
+    if report["ok"] and (args.save or args.output):
+        bpy.ops.wm.save_as_mainfile(filepath=args.output or bpy.data.filepath)
+        report["saved"] = args.output or bpy.data.filepath
+    report["seconds"] = round(time.perf_counter() - start, 4)
+
+    if args.report:
+        with open(args.report, "w") as report_file:
+            json.dump(report, report_file, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
+    return 0 if report["ok"] else 1
 
 
 # Registration functions
 def register():
+    bpy.types.Scene.techanim_bone_remap = bpy.props.StringProperty(
+        name="Bone Remap",
+        description="Extra donor to recipient bone name rules, e.g. 'Hips=pelvis, Spine1=spine_01'",
+        default="",
+    )
+    bpy.types.Scene.techanim_profiling = BoolProperty(
+        name="Record Timings",
+        description="Record phase timings and item counts of every TechAnim Friend operator run",
+        default=False,
+    )
+    bpy.types.Scene.techanim_profiling_cprofile = BoolProperty(
+        name="Record cProfile Trace",
+        description="Also run the recorded operators under cProfile, slower but needed for Save Profile",
+        default=False,
+    )
+    bpy.types.Scene.techanim_live_retarget = BoolProperty(
+        name="Live Retarget",
+        description="Copy the donor pose to the linked recipients on every frame change, without constraints",
+        default=False,
+        update=update_live_retarget,
+    )
     bpy.utils.register_class(CopyBonesTransformsEditModeOperator)
     bpy.utils.register_class(CopyBonesTransformsPoseModeOperator)
+    bpy.utils.register_class(BakeRetargetOperator)
     bpy.utils.register_class(CreateConstraintsOperator)
     bpy.utils.register_class(RemoveConstraintsOperator)
+    bpy.utils.register_class(LinkLiveRetargetOperator)
+    bpy.utils.register_class(UnlinkLiveRetargetOperator)
     bpy.utils.register_class(CleanUpBoneInfluencesOperator)
     bpy.utils.register_class(CleanUpWeightsThresholdOperator)
+    bpy.utils.register_class(QuantizeWeightsOperator)
+    bpy.utils.register_class(CompactVertexGroupsOperator)
     bpy.utils.register_class(SmoothSelectedVerticesWeightsOperator)
     bpy.utils.register_class(SymmetrizeAndSmoothWeightsOperator)
     bpy.utils.register_class(DistributeWeightsByDistanceOperator)
+    bpy.utils.register_class(HeatDiffuseWeightsOperator)
+    bpy.utils.register_class(TransferWeightsOperator)
+    bpy.utils.register_class(AnalyzeWeightsOperator)
+    bpy.utils.register_class(ExportWeightsOperator)
+    bpy.utils.register_class(ImportWeightsOperator)
+    bpy.utils.register_class(SaveProfileOperator)
+    bpy.utils.register_class(ClearProfileHistoryOperator)
     bpy.utils.register_class(TechAnimToolsPanel)
     bpy.utils.register_class(ItemWeightToolsPanel)
+    if live_retarget_handler not in bpy.app.handlers.frame_change_post:
+        bpy.app.handlers.frame_change_post.append(live_retarget_handler)
 
 def unregister():
     bpy.utils.unregister_class(CopyBonesTransformsEditModeOperator)
     bpy.utils.unregister_class(CopyBonesTransformsPoseModeOperator)
+    bpy.utils.unregister_class(BakeRetargetOperator)
     bpy.utils.unregister_class(CreateConstraintsOperator)
     bpy.utils.unregister_class(RemoveConstraintsOperator)
+    bpy.utils.unregister_class(LinkLiveRetargetOperator)
+    bpy.utils.unregister_class(UnlinkLiveRetargetOperator)
     bpy.utils.unregister_class(CleanUpBoneInfluencesOperator)
     bpy.utils.unregister_class(CleanUpWeightsThresholdOperator)
+    bpy.utils.unregister_class(QuantizeWeightsOperator)
+    bpy.utils.unregister_class(CompactVertexGroupsOperator)
     bpy.utils.unregister_class(SmoothSelectedVerticesWeightsOperator)
     bpy.utils.unregister_class(SymmetrizeAndSmoothWeightsOperator)
     bpy.utils.unregister_class(DistributeWeightsByDistanceOperator)
+    bpy.utils.unregister_class(HeatDiffuseWeightsOperator)
+    bpy.utils.unregister_class(TransferWeightsOperator)
+    bpy.utils.unregister_class(AnalyzeWeightsOperator)
+    bpy.utils.unregister_class(ExportWeightsOperator)
+    bpy.utils.unregister_class(ImportWeightsOperator)
+    bpy.utils.unregister_class(SaveProfileOperator)
+    bpy.utils.unregister_class(ClearProfileHistoryOperator)
     bpy.utils.unregister_class(TechAnimToolsPanel)
     bpy.utils.unregister_class(ItemWeightToolsPanel)
+    if live_retarget_handler in bpy.app.handlers.frame_change_post:
+        bpy.app.handlers.frame_change_post.remove(live_retarget_handler)
+    del bpy.types.Scene.techanim_bone_remap
+    del bpy.types.Scene.techanim_profiling
+    del bpy.types.Scene.techanim_profiling_cprofile
+    del bpy.types.Scene.techanim_live_retarget
 
 if __name__ == "__main__":
-    register()
\ No newline at end of file
+    register()
+
+    # Arguments after "--" run the headless pipeline
+    if "--" in sys.argv:
+        sys.exit(run_cli(sys.argv[sys.argv.index("--") + 1:]))
\ No newline at end of file